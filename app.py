@@ -7,10 +7,21 @@ import datetime
 import hashlib
 import time
 import re
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urlparse, urljoin
+import os
+import json
+import sqlite3
+import calendar
+import sys
+import random
+import heapq
+import statistics
+import itertools
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse, urljoin, urlunparse, parse_qsl, urlencode
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeout
 from io import BytesIO
 from PIL import Image
 from supabase import create_client, Client
@@ -19,6 +30,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+try:
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:  # optional fast HTML parser; BeautifulSoup's html.parser is used without it
+    lxml_html = None
+    lxml_etree = None
+
 # ============= CONFIGURATION =============
 class ClickMovementConfig:
     WORDPRESS_SITES = {
@@ -109,11 +127,201 @@ class ClickMovementConfig:
     MIN_WORDS = 350
     MAX_WORDS = 800
     ARTICLES_PER_SITE = 10
+    FETCH_TIME_BUDGET = 20
+    FEED_WORKERS = 8
+    SCRAPE_WORKERS = 8
+    SCRAPE_PER_DOMAIN = 2
+    REWRITE_WORKERS = 3
+    REWRITE_PREFETCH_ARTICLES = 10
+    REWRITE_RERUN_INTERVAL = 20
+    INDEX_SYNC_INTERVAL = 60
+    DB_QUERY_TIMEOUT = 5
+    NEAR_DUP_DISTANCE = 3
+    SCRAPE_CACHE_TTL = 6 * 3600
+    SCRAPE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+    REWRITE_CACHE_TTL = 7 * 24 * 3600
+    REWRITE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+    HTML_EXTRACTOR = 'lxml' if lxml_html else 'html.parser'
+    PAGE_MAX_BYTES = 2 * 1024 * 1024
+    IMAGE_MAX_BYTES = 10 * 1024 * 1024
+    FEED_IMAGE_MIN_WIDTH = 600
+    PREVIEW_MAX_SIDE = 480
+    DOWNLOAD_CHUNK_BYTES = 64 * 1024
+    FEED_TIMEOUT = 8
+    BREAKER_THRESHOLD = 3
+    BREAKER_BASE_BACKOFF = 60
+    BREAKER_MAX_BACKOFF = 3600
+    POLL_INTERVAL = 300
+    POLLER_STALE_AFTER = 900
+    POLL_MIN_INTERVAL = 60
+    POLL_MAX_INTERVAL = 1800
+    ENTRY_MAX_AGE = 48 * 3600
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
     ANTHROPIC_KEY = st.secrets.get("anthropic_key", "")
     SUPABASE_URL = st.secrets.get("supabase_url", "")
     SUPABASE_KEY = st.secrets.get("supabase_key", "")
 
+# ============= NEAR-DUPLICATE DETECTION =============
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """64-bit SimHash over word shingles; rewrites of the same story land a few bits apart"""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < shingle_size:
+        return None
+
+    counts = {}
+    for i in range(len(words) - shingle_size + 1):
+        shingle = ' '.join(words[i:i + shingle_size])
+        digest = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        counts[digest] = counts.get(digest, 0) + 1
+
+    fingerprint = 0
+    for bit in range(64):
+        mask = 1 << bit
+        if sum(count if digest & mask else -count for digest, count in counts.items()) > 0:
+            fingerprint |= mask
+    return fingerprint
+
+
+class SimHashIndex:
+    """LSH over 64-bit fingerprints: 4 bands of 16 bits, so anything within 3 bits shares a band"""
+
+    BANDS = 4
+    BAND_BITS = 16
+
+    def __init__(self):
+        self.buckets = [{} for _ in range(self.BANDS)]
+
+    def _bands(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.BAND_BITS) - 1
+        return [(fingerprint >> (band * self.BAND_BITS)) & mask for band in range(self.BANDS)]
+
+    def add(self, fingerprint: int):
+        for bucket, value in zip(self.buckets, self._bands(fingerprint)):
+            bucket.setdefault(value, set()).add(fingerprint)
+
+    def similar(self, fingerprint: int, max_distance: int) -> bool:
+        for bucket, value in zip(self.buckets, self._bands(fingerprint)):
+            # Snapshot: a background index refresh may be adding to this bucket
+            for candidate in tuple(bucket.get(value, ())):
+                if bin(candidate ^ fingerprint).count('1') <= max_distance:
+                    return True
+        return False
+
 # ============= SUPABASE DATABASE =============
+MISSING_COLUMN_CODES = ('PGRST204', '42703')
+
+
+def is_missing_column(error: Exception) -> bool:
+    """True for PostgREST's unknown-column errors, e.g. processed_articles before the simhash migration"""
+    return getattr(error, 'code', None) in MISSING_COLUMN_CODES
+
+
+class ProcessedIndex:
+    """In-memory url_hash / content_hash sets of processed_articles, synced incrementally by id"""
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, client):
+        self.client = client
+        self.url_hashes = set()
+        self.content_hashes = {}  # site -> set of content hashes
+        self.fingerprints = {}  # site -> SimHashIndex
+        self.has_simhash = True  # cleared if processed_articles has no simhash column yet
+        self.last_id = 0
+        self.synced_at = 0.0
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def sync(self) -> bool:
+        """Start pulling rows newer than the last seen id on a background thread when due; True once a
+        full load has completed. Never blocks: until then callers fall back to batched queries"""
+        if not self.client:
+            return False
+        if self._due() and self._lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh, daemon=True).start()
+        return self.loaded
+
+    def _due(self) -> bool:
+        return time.time() - self.synced_at >= ClickMovementConfig.INDEX_SYNC_INTERVAL
+
+    def _refresh(self):
+        try:
+            # Another thread may have finished a sync between this one's due check and taking the lock
+            if self._due():
+                self._pull()
+        finally:
+            self._lock.release()
+
+    def _pull(self):
+        """Page through new rows; the caller holds _lock"""
+        try:
+            while True:
+                rows = self._fetch_page()
+                for row in rows:
+                    self.add(row['url_hash'], row['content_hash'], row['site'], row.get('simhash'))
+                    self.last_id = max(self.last_id, row['id'])
+                if len(rows) < self.PAGE_SIZE:
+                    break
+            self.loaded = True
+        except Exception as e:
+            # Keep answering from what we have; the next sync resumes from last_id
+            pass
+        # Failures wait out the interval too, so a slow or down Supabase isn't hit on every lookup
+        self.synced_at = time.time()
+
+    def _fetch_page(self) -> List[Dict]:
+        columns = 'id, url_hash, content_hash, site'
+        try:
+            return self.client.table('processed_articles')\
+                .select(columns + (', simhash' if self.has_simhash else ''))\
+                .gt('id', self.last_id)\
+                .order('id')\
+                .limit(self.PAGE_SIZE)\
+                .execute().data or []
+        except Exception as e:
+            # Only the pre-migration schema turns fingerprints off; anything else is a failed sync
+            if not self.has_simhash or not is_missing_column(e):
+                raise
+            self.has_simhash = False
+            return self._fetch_page()
+
+    def add(self, url_hash: Optional[str], content_hash: Optional[str], site: Optional[str],
+            fingerprint: Optional[str] = None):
+        if url_hash:
+            self.url_hashes.add(url_hash)
+        if content_hash and site:
+            self.content_hashes.setdefault(site, set()).add(content_hash)
+        if fingerprint and site:
+            self.fingerprints.setdefault(site, SimHashIndex()).add(int(fingerprint, 16))
+
+    def lookup(self, url_hashes: List[str], content_hash: Optional[str], sites: List[str],
+               fingerprint: Optional[int] = None) -> Dict[str, bool]:
+        """Exact match on any of the URL's hashes (any site), exact content match or near-duplicate
+        content (per site)"""
+        if any(url_hash in self.url_hashes for url_hash in url_hashes):
+            return {site: True for site in sites}
+        result = {}
+        for site in sites:
+            result[site] = bool(content_hash) and content_hash in self.content_hashes.get(site, ())
+            if not result[site] and fingerprint is not None and site in self.fingerprints:
+                result[site] = self.fingerprints[site].similar(fingerprint, ClickMovementConfig.NEAR_DUP_DISTANCE)
+        return result
+
+
+@st.cache_resource
+def get_processed_index(_client) -> ProcessedIndex:
+    """One index per server process, shared across sessions and reruns; the first load starts right away"""
+    index = ProcessedIndex(_client)
+    index.sync()
+    return index
+
+
+@st.cache_resource
+def get_query_pool() -> ThreadPoolExecutor:
+    """Threads that run Supabase queries a caller has stopped waiting for to completion"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
 class SupabaseDatabase:
     def __init__(self):
         if ClickMovementConfig.SUPABASE_URL and ClickMovementConfig.SUPABASE_KEY:
@@ -125,14 +333,34 @@ class SupabaseDatabase:
             self.client = None
             st.warning("Supabase not configured. Features disabled.")
 
+        self.index = get_processed_index(self.client) if self.client else None
+
+    @staticmethod
+    def _execute(query, timeout: Optional[float] = None):
+        """query.execute(), giving up after timeout seconds; postgrest has no per-request timeout"""
+        if timeout is None:
+            return query.execute()
+        return get_query_pool().submit(query.execute).result(timeout=timeout)
+
+    @staticmethod
+    def _url_hash(url: str) -> str:
+        return hashlib.md5(url.encode()).hexdigest()
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.md5(content[:1000].encode()).hexdigest()
+
     def is_duplicate(self, url: str, content: str, site: str) -> bool:
         """Check if article is duplicate by URL or similar content"""
         if not self.client:
             return False
 
         try:
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            content_hash = hashlib.md5(content[:1000].encode()).hexdigest()
+            url_hash = self._url_hash(url)
+            content_hash = self._content_hash(content)
+
+            if self.index and self.index.sync():
+                return self.index.lookup([url_hash], content_hash, [site])[site]
 
             url_check = self.client.table('processed_articles').select('id').eq('url_hash', url_hash).execute()
             if url_check.data:
@@ -146,22 +374,98 @@ class SupabaseDatabase:
         except Exception as e:
             return False
 
-    def add_processed(self, url: str, content: str, title: str, site: str, wordpress_post_id: Optional[int] = None):
-        """Add processed article to database"""
+    def find_duplicates(self, articles: List[Tuple[str, Optional[str]]], sites: List[str],
+                        aliases: Optional[Dict[str, str]] = None,
+                        deadline: Optional['Deadline'] = None) -> Dict[str, Dict[str, bool]]:
+        """Batch is_duplicate: {url: {site: is_dup}} for (url, content) pairs, answered from the local
+        index (including SimHash near-duplicates) when it is loaded, otherwise in at most two queries per chunk,
+        each bounded by the deadline; a query that times out counts its URLs as new.
+
+        A URL already processed for any site is a duplicate everywhere; a content match only counts for
+        its own site. Pass content=None to check URLs alone (e.g. before scraping). aliases maps a URL
+        to the link as the feed published it: rows written before links were canonicalised hash that.
+        """
+        result = {url: {site: False for site in sites} for url, _ in articles}
+        if not self.client or not articles:
+            return result
+
+        aliases = aliases or {}
+
+        def hashes(url: str) -> List[str]:
+            return [self._url_hash(link) for link in {url, aliases.get(url) or url}]
+
+        if self.index and self.index.sync():
+            return {url: self.index.lookup(hashes(url),
+                                           self._content_hash(content) if content else None,
+                                           sites,
+                                           simhash(content) if content else None)
+                    for url, content in articles}
+
+        url_hashes = {url_hash: url for url, _ in articles for url_hash in hashes(url)}
+        content_hashes = {}
+        for url, content in articles:
+            if content:
+                content_hashes.setdefault(self._content_hash(content), []).append(url)
+
+        def timeout() -> Optional[float]:
+            return deadline.timeout(ClickMovementConfig.DB_QUERY_TIMEOUT) if deadline else None
+
+        try:
+            for chunk in self._chunks(list(url_hashes)):
+                rows = self._execute(self.client.table('processed_articles').select('url_hash')
+                                     .in_('url_hash', chunk), timeout())
+                for row in rows.data or []:
+                    result[url_hashes[row['url_hash']]] = {site: True for site in sites}
+
+            for chunk in self._chunks(list(content_hashes)):
+                rows = self._execute(self.client.table('processed_articles').select('content_hash, site')
+                                     .in_('content_hash', chunk).in_('site', sites), timeout())
+                for row in rows.data or []:
+                    for url in content_hashes[row['content_hash']]:
+                        result[url][row['site']] = True
+        except Exception as e:
+            pass
+
+        return result
+
+    @staticmethod
+    def _chunks(values: List[str], size: int = 100) -> List[List[str]]:
+        return [values[i:i + size] for i in range(0, len(values), size)]
+
+    def add_processed(self, url: str, content: str, title: str, site: str, wordpress_post_id: Optional[int] = None,
+                      source_content: Optional[str] = None):
+        """Add processed article to database; the near-duplicate fingerprint uses source_content when given"""
         if not self.client:
             return
 
         try:
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            content_hash = hashlib.md5(content[:1000].encode()).hexdigest()
+            url_hash = self._url_hash(url)
+            content_hash = self._content_hash(content)
+            fingerprint = simhash(source_content or content)
+            fingerprint_hex = f"{fingerprint:016x}" if fingerprint is not None else None
 
-            self.client.table('processed_articles').insert({
+            row = {
                 'url_hash': url_hash,
                 'content_hash': content_hash,
                 'title': title,
                 'site': site,
                 'wordpress_post_id': wordpress_post_id
-            }).execute()
+            }
+            # The process-wide index remembers whether processed_articles has the simhash column yet
+            with_simhash = not self.index or self.index.has_simhash
+            try:
+                self.client.table('processed_articles').insert(
+                    {**row, 'simhash': fingerprint_hex} if with_simhash else row).execute()
+            except Exception as e:
+                if not (with_simhash and is_missing_column(e)):
+                    raise
+                # Rejected before anything was written, so the retry cannot duplicate the row
+                if self.index:
+                    self.index.has_simhash = False
+                self.client.table('processed_articles').insert(row).execute()
+
+            if self.index:
+                self.index.add(url_hash, content_hash, site, fingerprint_hex)
         except Exception as e:
             pass
 
@@ -256,40 +560,599 @@ class SupabaseDatabase:
         except Exception as e:
             pass
 
+# ============= URL HELPERS =============
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'cmpid', 'cmp', 'intcmp',
+                   'ocid', 'ftag', 'taid', 'smid', 'ref', 'feedtype', 'feedname', 'traffic_source',
+                   'yptr', '_ga', 'ito', 'at_medium', 'at_campaign'}
+
+
+def canonical_url(url: str) -> str:
+    """Strip tracking params and fragments and lowercase the host so the same story keeps one URL"""
+    if not url:
+        return ""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = (parsed.hostname or '').lower()
+    if parsed.port and not ((parsed.scheme == 'http' and parsed.port == 80) or
+                            (parsed.scheme == 'https' and parsed.port == 443)):
+        host = f"{host}:{parsed.port}"
+
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS]
+
+    return urlunparse((parsed.scheme.lower() or 'https', host, parsed.path or '/', parsed.params,
+                       urlencode(query), ''))
+
+
+def url_key(url: str) -> str:
+    """Scheme- and www-insensitive identity of a canonical URL, used for deduplication"""
+    parsed = urlparse(canonical_url(url))
+    host = parsed.netloc[4:] if parsed.netloc.startswith('www.') else parsed.netloc
+    return f"{host}{parsed.path.rstrip('/')}" + (f"?{parsed.query}" if parsed.query else "")
+
+# ============= DEADLINE =============
+class Deadline:
+    """Time budget shared by the fetch, scrape and image stages; records which stages it cut short"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.started = time.time()
+        self.expires_at = self.started + seconds if seconds else None
+        self.cut_stages = []
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def timeout(self, cap: float) -> float:
+        """Request timeout that never runs past the deadline"""
+        remaining = self.remaining()
+        return cap if remaining is None else max(0.1, min(cap, remaining))
+
+    def cut(self, stage: str):
+        if stage not in self.cut_stages:
+            self.cut_stages.append(stage)
+
+# ============= SQLITE STORES =============
+class SQLiteStore:
+    """Base for the local caches under CACHE_DIR: one short-lived WAL connection per call, so
+    Streamlit sessions, worker threads and the poller process can share a file"""
+
+    FILENAME = ''
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(ClickMovementConfig.CACHE_DIR, self.FILENAME)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            self._create(conn)
+
+    def _create(self, conn: sqlite3.Connection):
+        """Create tables and indexes if missing"""
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, table: str, key_col: str, ttl_col: str, ttl: float, max_bytes: int):
+        """Delete rows older than ttl, then least recently accessed rows until the size column sums
+        to at most max_bytes"""
+        conn.execute(f'DELETE FROM {table} WHERE {ttl_col} < ?', (time.time() - ttl,))
+        excess = conn.execute(f'SELECT COALESCE(SUM(size), 0) FROM {table}').fetchone()[0] - max_bytes
+        if excess <= 0:
+            return
+
+        stale = []
+        for key, size in conn.execute(f'SELECT {key_col}, size FROM {table} ORDER BY accessed_at'):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany(f'DELETE FROM {table} WHERE {key_col} = ?', stale)
+
+# ============= FEED CACHE =============
+class FeedCache(SQLiteStore):
+    """Per-feed ETag / Last-Modified and parsed entries, persisted in SQLite"""
+
+    FILENAME = 'feeds.sqlite3'
+
+    def _create(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                modified TEXT,
+                entries TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT etag, modified, entries, fetched_at FROM feed_cache WHERE url = ?', (url,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if not row:
+            return None
+        return {'etag': row[0], 'modified': row[1], 'entries': json.loads(row[2]), 'fetched_at': row[3]}
+
+    def put(self, url: str, etag: Optional[str], modified: Optional[str], entries: List[Dict]):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO feed_cache (url, etag, modified, entries, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                    (url, etag, modified, json.dumps(entries), time.time())
+                )
+        except sqlite3.Error:
+            pass
+
+class FeedHealth(SQLiteStore):
+    """Per-source health record and circuit breaker, persisted next to the feed cache"""
+
+    FILENAME = 'feeds.sqlite3'
+
+    def _create(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_health (
+                url TEXT PRIMARY KEY,
+                last_success REAL,
+                last_failure REAL,
+                failure_streak INTEGER NOT NULL DEFAULT 0,
+                latency REAL,
+                last_error TEXT,
+                open_until REAL NOT NULL DEFAULT 0
+            )
+        """)
+
+    def get(self, url: str) -> Dict:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT last_success, last_failure, failure_streak, latency, last_error, open_until '
+                    'FROM feed_health WHERE url = ?', (url,)
+                ).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        if not row:
+            return {'url': url, 'last_success': None, 'last_failure': None, 'failure_streak': 0,
+                    'latency': None, 'last_error': None, 'open_until': 0}
+        return {'url': url, 'last_success': row[0], 'last_failure': row[1], 'failure_streak': row[2],
+                'latency': row[3], 'last_error': row[4], 'open_until': row[5]}
+
+    def all(self) -> List[Dict]:
+        try:
+            with self._connect() as conn:
+                urls = [row[0] for row in conn.execute('SELECT url FROM feed_health ORDER BY url')]
+        except sqlite3.Error:
+            return []
+        return [self.get(url) for url in urls]
+
+    def allow(self, url: str) -> bool:
+        """Closed or half-open breakers let a request through; open ones skip the source"""
+        record = self.get(url)
+        if record['failure_streak'] < ClickMovementConfig.BREAKER_THRESHOLD:
+            return True
+        return time.time() >= record['open_until']
+
+    def record_success(self, url: str, latency: float):
+        self._write(url, last_success=time.time(), failure_streak=0, latency=latency,
+                    last_error=None, open_until=0)
+
+    def record_failure(self, url: str, latency: float, error: str):
+        record = self.get(url)
+        streak = record['failure_streak'] + 1
+        open_until = 0
+        if streak >= ClickMovementConfig.BREAKER_THRESHOLD:
+            backoff = ClickMovementConfig.BREAKER_BASE_BACKOFF * 2 ** (streak - ClickMovementConfig.BREAKER_THRESHOLD)
+            open_until = time.time() + min(backoff, ClickMovementConfig.BREAKER_MAX_BACKOFF)
+
+        self._write(url, last_success=record['last_success'], last_failure=time.time(),
+                    failure_streak=streak, latency=latency, last_error=error[:500], open_until=open_until)
+
+    def _write(self, url: str, **fields):
+        record = self.get(url)
+        record.update(fields)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO feed_health '
+                    '(url, last_success, last_failure, failure_streak, latency, last_error, open_until) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (url, record['last_success'], record['last_failure'], record['failure_streak'],
+                     record['latency'], record['last_error'], record['open_until'])
+                )
+        except sqlite3.Error:
+            pass
+
+class EntryStore(SQLiteStore):
+    """Append-only store of feed entries written by FeedPoller and queried by NewsFetcher"""
+
+    FILENAME = 'entries.sqlite3'
+
+    def _create(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url_key TEXT PRIMARY KEY,
+                link TEXT NOT NULL,
+                title TEXT,
+                summary TEXT,
+                source TEXT,
+                feed_url TEXT NOT NULL,
+                weight INTEGER NOT NULL,
+                is_us INTEGER NOT NULL,
+                published REAL,
+                first_seen REAL NOT NULL,
+                recency REAL NOT NULL,
+                base_score INTEGER NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_feed_recency ON entries (feed_url, recency)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_rank ON entries (base_score DESC, recency DESC)')
+        conn.execute('CREATE TABLE IF NOT EXISTS poller_state (key TEXT PRIMARY KEY, value REAL)')
+        # Stores created before feed bodies and media were kept
+        for column in ('content', 'images', 'raw_link'):
+            try:
+                conn.execute(f'ALTER TABLE entries ADD COLUMN {column} TEXT')
+            except sqlite3.OperationalError:
+                pass
+
+    def add_entries(self, articles: List[Dict]) -> int:
+        """Insert entries not seen before; returns how many were new"""
+        now = time.time()
+        scorer = KeywordScorer.for_themes([])
+        rows = []
+        for article in articles:
+            key = url_key(article['link'])
+            if not key:
+                continue
+            rows.append((key, article['link'], article.get('raw_link'), article['title'], article['summary'],
+                         article.get('content', ''), json.dumps(article.get('images', [])), article['source'], article['feed_url'], article['weight'], int(article['is_us']),
+                         article.get('published'), now, article.get('published') or now,
+                         scorer.score(article, article['weight'])))
+
+        try:
+            with self._connect() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    'INSERT OR IGNORE INTO entries (url_key, link, raw_link, title, summary, content, images, '
+                    'source, feed_url, weight, is_us, published, first_seen, recency, base_score) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                return conn.total_changes - before
+        except sqlite3.Error:
+            return 0
+
+    def query(self, feed_urls: List[str], limit: int) -> List[Dict]:
+        """Recent entries from the given feeds, best base score and newest first"""
+        if not feed_urls:
+            return []
+        placeholders = ','.join('?' * len(feed_urls))
+        cutoff = time.time() - ClickMovementConfig.ENTRY_MAX_AGE
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f'SELECT link, title, summary, source, weight, is_us, published, content, images, raw_link '
+                    f'FROM entries '
+                    f'WHERE feed_url IN ({placeholders}) AND recency >= ? '
+                    f'ORDER BY base_score DESC, recency DESC LIMIT ?',
+                    (*feed_urls, cutoff, limit)
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+
+        return [{'title': row[1], 'link': row[0], 'summary': row[2], 'source': row[3],
+                 'weight': row[4], 'is_us': bool(row[5]), 'published': row[6], 'content': row[7] or '',
+                 'images': json.loads(row[8]) if row[8] else [], 'raw_link': row[9] or row[0]}
+                for row in rows]
+
+    def prune(self):
+        try:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM entries WHERE recency < ?',
+                             (time.time() - ClickMovementConfig.ENTRY_MAX_AGE,))
+        except sqlite3.Error:
+            pass
+
+    def mark_polled(self):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO poller_state (key, value) VALUES ('last_poll', ?)",
+                             (time.time(),))
+        except sqlite3.Error:
+            pass
+
+    def is_fresh(self) -> bool:
+        """True while a poller has written recently enough for the store to replace live fetching"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM poller_state WHERE key = 'last_poll'").fetchone()
+        except sqlite3.Error:
+            return False
+        return bool(row) and time.time() - row[0] < ClickMovementConfig.POLLER_STALE_AFTER
+
+# ============= KEYWORD SCORER =============
+class KeywordScorer:
+    """Theme and US-keyword scoring compiled into one word-boundary regex per theme set"""
+
+    THEME_POINTS = 25
+    KEYWORD_POINTS = 15
+    US_KEYWORDS = ['america', 'united states', 'washington', 'congress',
+                   'senate', 'house', 'trump', 'biden', 'republican', 'democrat',
+                   'border', 'immigration', 'texas', 'california', 'florida']
+    # Matched against the original text: lowercased, 'US' can't be told apart from the pronoun 'us'
+    CASED_KEYWORDS = ['US', 'U.S.']
+    # Endings that still name the same term; every other term must match as a whole word,
+    # so 'US' never matches 'USS'. Possessives need no entry: the apostrophe ends the word
+    SUFFIXES = {'america': ['n', 'ns'], 'republican': ['s'], 'democrat': ['s', 'ic'], 'conservative': ['s']}
+
+    _compiled: Dict[Tuple[str, ...], 'KeywordScorer'] = {}
+
+    def __init__(self, themes: List[str]):
+        self.points = {}
+        for theme in themes:
+            term = theme.lower().strip()
+            if term:
+                self.points[term] = self.points.get(term, 0) + self.THEME_POINTS
+        for keyword in self.US_KEYWORDS:
+            self.points[keyword] = self.points.get(keyword, 0) + self.KEYWORD_POINTS
+
+        # Every accepted spelling maps back to its term; longest first so 'united states' wins over 'us'
+        self.variants = {}
+        for term in self.points:
+            for suffix in [''] + self.SUFFIXES.get(term, []):
+                self.variants[term + suffix] = term
+        alternation = '|'.join(re.escape(variant) for variant in sorted(self.variants, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<!\w)({alternation})(?!\w)")
+
+        for keyword in self.CASED_KEYWORDS:
+            self.points[keyword] = self.KEYWORD_POINTS
+        cased = '|'.join(re.escape(keyword) for keyword in sorted(self.CASED_KEYWORDS, key=len, reverse=True))
+        self.cased_pattern = re.compile(rf"(?<!\w)({cased})(?!\w)")
+
+    @classmethod
+    def for_themes(cls, themes: List[str]) -> 'KeywordScorer':
+        key = tuple(sorted(set(themes)))
+        if key not in cls._compiled:
+            cls._compiled[key] = cls(list(key))
+        return cls._compiled[key]
+
+    def score(self, entry: Dict, weight: int) -> int:
+        text = f"{entry.get('title', '')} {entry.get('summary', '')}"
+        found = {self.variants[variant] for variant in self.pattern.findall(text.lower())}
+        found.update(self.cased_pattern.findall(text))
+        return weight * 10 + sum(self.points[term] for term in found)
+
 # ============= NEWS FETCHER =============
 class NewsFetcher:
+    US_SOURCES = ['Reuters', 'AP Breaking', 'AP News', 'Fox News', 'Fox Politics',
+                  'Newsmax', 'CNN Breaking', 'CBS', 'NBC', 'ABC News', 'USA Today',
+                  'Daily Wire', 'Breitbart', 'PJ Media', 'Federalist', 'RedState',
+                  'Townhall', 'Daily Caller', 'Politico', 'The Hill']
+
+    def __init__(self, max_workers: Optional[int] = None, cache: Optional[FeedCache] = None,
+                 health: Optional[FeedHealth] = None, store: Optional[EntryStore] = None):
+        self.max_workers = max_workers or ClickMovementConfig.FEED_WORKERS
+        self.cache = cache or FeedCache()
+        self.health = health or FeedHealth()
+        self.store = store or EntryStore()
+
     def fetch_articles(self, themes: List[str], limit: int = 50) -> List[Dict]:
-        all_articles = []
-        categories = self._get_categories(themes)
+        sources = self._get_sources(themes)
 
-        us_sources = ['Reuters', 'AP Breaking', 'AP News', 'Fox News', 'Fox Politics',
-                      'Newsmax', 'CNN Breaking', 'CBS', 'NBC', 'ABC News', 'USA Today',
-                      'Daily Wire', 'Breitbart', 'PJ Media', 'Federalist', 'RedState',
-                      'Townhall', 'Daily Caller', 'Politico', 'The Hill']
+        # A running poller keeps the entry store current, so read from it instead of the network
+        if self.store.is_fresh():
+            all_articles = self.store.query([source['rss'] for source in sources], limit * 10)
+        else:
+            all_articles = self._dedupe(self.fetch_sources(sources))
 
-        for category in categories:
-            for source in ClickMovementConfig.NEWS_SOURCES.get(category, []):
-                try:
-                    feed = feedparser.parse(source['rss'])
-                    for entry in feed.entries[:20]:
-                        weight = source['weight']
-                        if source['name'] in us_sources:
-                            weight *= 3
-
-                        all_articles.append({
-                            'title': entry.get('title', ''),
-                            'link': entry.get('link', ''),
-                            'summary': entry.get('summary', ''),
-                            'source': source['name'],
-                            'score': self._score(entry, themes, weight),
-                            'is_us': source['name'] in us_sources
-                        })
-                except:
-                    continue
+        scorer = KeywordScorer.for_themes(themes)
+        for article in all_articles:
+            article['score'] = scorer.score(article, article.pop('weight'))
 
         all_articles.sort(key=lambda x: x['score'], reverse=True)
         return all_articles[:limit]
 
+    def stream_articles(self, themes: List[str], limit: int = 50,
+                        deadline: Optional[Deadline] = None) -> Iterator[List[Dict]]:
+        """Yield newly admitted top-k candidates (best first) each time a feed completes"""
+        if self.store.is_fresh():
+            yield self.fetch_articles(themes, limit)
+            return
+
+        deadline = deadline or Deadline()
+        sources = self._get_sources(themes)
+        scorer = KeywordScorer.for_themes(themes)
+        seen = set()
+        top = []  # min-heap of (score, -arrival, article) bounded to limit
+        arrival = itertools.count()
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources))))
+        try:
+            futures = [executor.submit(self._fetch_source, source, deadline) for source in sources]
+            for future in as_completed(futures, timeout=deadline.remaining()):
+                admitted = []
+                for article in future.result():
+                    key = url_key(article['link'])
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+
+                    article['score'] = scorer.score(article, article.pop('weight'))
+                    item = (article['score'], -next(arrival), article)
+                    if len(top) < limit:
+                        heapq.heappush(top, item)
+                    elif item[:2] > top[0][:2]:
+                        heapq.heapreplace(top, item)
+                    else:
+                        continue
+                    admitted.append(article)
+
+                if admitted:
+                    yield sorted(admitted, key=lambda x: x['score'], reverse=True)
+        except FuturesTimeout:
+            deadline.cut('feeds')
+        finally:
+            # Don't wait on feeds still in flight; their requests are bounded by the deadline timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_sources(self, sources: List[Dict]) -> List[Dict]:
+        """Fetch feeds in parallel and merge in source order so ties sort the same way each run"""
+        results = [[] for _ in sources]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources)))) as executor:
+            futures = {executor.submit(self._fetch_source, source): i
+                       for i, source in enumerate(sources)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return [article for batch in results for article in batch]
+
+    def _get_sources(self, themes: Optional[List[str]]) -> List[Dict]:
+        """Unique feeds for the themes' categories (all feeds when themes is None); a feed listed twice keeps its highest weight"""
+        categories = self._get_categories(themes) if themes is not None else set(ClickMovementConfig.NEWS_SOURCES)
+        sources = {}
+        for category, category_sources in ClickMovementConfig.NEWS_SOURCES.items():
+            if category not in categories:
+                continue
+            for source in category_sources:
+                if source['rss'] not in sources:
+                    sources[source['rss']] = dict(source)
+                elif source['weight'] > sources[source['rss']]['weight']:
+                    sources[source['rss']]['weight'] = source['weight']
+        return list(sources.values())
+
+    def _dedupe(self, articles: List[Dict]) -> List[Dict]:
+        """Keep one entry per canonical link, preferring the higher-weighted source"""
+        unique = {}
+        for article in articles:
+            key = url_key(article['link'])
+            if not key:
+                continue
+            if key not in unique or article['weight'] > unique[key]['weight']:
+                unique[key] = article
+        return list(unique.values())
+
+    def _fetch_source(self, source: Dict, deadline: Optional[Deadline] = None) -> List[Dict]:
+        url = source['rss']
+        if not self.health.allow(url) or (deadline and deadline.expired()):
+            return []
+
+        started = time.time()
+        try:
+            timeout = deadline.timeout(ClickMovementConfig.FEED_TIMEOUT) if deadline else ClickMovementConfig.FEED_TIMEOUT
+            entries = self._fetch_entries(url, timeout)
+        except Exception as e:
+            # A request cut off by the caller's deadline says nothing about the feed's health
+            if not (deadline and deadline.expired()):
+                self.health.record_failure(url, time.time() - started, str(e))
+            return []
+        self.health.record_success(url, time.time() - started)
+
+        is_us = source['name'] in self.US_SOURCES
+        weight = source['weight'] * 3 if is_us else source['weight']
+
+        articles = []
+        for entry in entries[:20]:
+            articles.append({
+                'title': entry.get('title', ''),
+                'link': canonical_url(entry.get('link', '')),
+                # processed_articles rows from before canonical links hash the raw link
+                'raw_link': entry.get('link', ''),
+                'summary': entry.get('summary', ''),
+                'content': entry.get('content', ''),
+                'images': entry.get('images', []),
+                'source': source['name'],
+                'feed_url': url,
+                'weight': weight,
+                'is_us': is_us,
+                'published': entry.get('published')
+            })
+        return articles
+
+    def _fetch_entries(self, url: str, timeout: float = ClickMovementConfig.FEED_TIMEOUT) -> List[Dict]:
+        """Conditional GET against the feed cache; a 304 reuses the stored entries"""
+        cached = self.cache.get(url)
+
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['modified']:
+            headers['If-Modified-Since'] = cached['modified']
+
+        response = requests.get(url, timeout=timeout, headers=headers)
+        if cached and response.status_code == 304:
+            return cached['entries']
+        response.raise_for_status()
+
+        # feedparser reads the charset from Content-Type and resolves relative links against Content-Location;
+        # it looks headers up by lowercase name
+        response_headers = {name.lower(): value for name, value in response.headers.items()}
+        feed = feedparser.parse(response.content,
+                                response_headers={**response_headers, 'content-location': response.url})
+        entries = [self._entry_to_dict(entry) for entry in feed.entries[:20]]
+        if not entries:
+            if feed.get('bozo'):
+                raise ValueError(f"Unparseable feed: {feed.get('bozo_exception')}")
+            return cached['entries'] if cached else []
+
+        self.cache.put(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), entries)
+        return entries
+
+    @staticmethod
+    def _entry_to_dict(entry) -> Dict:
+        published = entry.get('published_parsed') or entry.get('updated_parsed')
+        return {
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'summary': entry.get('summary', ''),
+            'content': NewsFetcher._full_content(entry),
+            'images': NewsFetcher._feed_images(entry),
+            'published': calendar.timegm(published) if published else None
+        }
+
+    @staticmethod
+    def _full_content(entry) -> str:
+        """Full article HTML from content:encoded (WordPress feeds carry the whole post), '' for teaser feeds"""
+        bodies = [part.get('value', '') for part in entry.get('content', []) if 'html' in part.get('type', 'text/html')]
+        body = max(bodies, key=len, default='')
+        return body if len(body) > len(entry.get('summary', '')) else ''
+
+    @staticmethod
+    def _feed_images(entry) -> List[str]:
+        """media:content, media:thumbnail and image enclosures wide enough to publish, widest first.
+        media:content without a width is usually the full-size original; thumbnails must say they are big"""
+        def width(media) -> int:
+            try:
+                return int(media.get('width') or 0)
+            except ValueError:
+                return 0
+
+        candidates = []
+        for media in entry.get('media_content', []):
+            if media.get('medium', 'image') == 'image' and media.get('type', 'image/').startswith('image/'):
+                if not width(media) or width(media) >= ClickMovementConfig.FEED_IMAGE_MIN_WIDTH:
+                    candidates.append((width(media), media.get('url')))
+        for media in entry.get('media_thumbnail', []):
+            if width(media) >= ClickMovementConfig.FEED_IMAGE_MIN_WIDTH:
+                candidates.append((width(media), media.get('url')))
+        for enclosure in entry.get('enclosures', []):
+            if enclosure.get('type', '').startswith('image/'):
+                candidates.append((0, enclosure.get('href')))
+
+        candidates.sort(key=lambda candidate: -candidate[0])
+        return list(dict.fromkeys(url for _, url in candidates if url))
+
     def _get_categories(self, themes):
         cats = set()
         for theme in themes:
@@ -305,29 +1168,428 @@ class NewsFetcher:
                 cats.add("mainstream")
         return cats or {"breaking", "mainstream", "conservative"}
 
-    def _score(self, entry, themes, weight):
-        score = weight * 10
-        text = f"{entry.get('title', '')} {entry.get('summary', '')}".lower()
+# ============= FEED POLLER =============
+class PollScheduler:
+    """Min-heap of feeds keyed by next poll time; each feed's interval follows its publishing rate"""
+
+    SMOOTHING = 0.3
+
+    def __init__(self, sources: List[Dict]):
+        now = time.time()
+        self.sources = {source['rss']: source for source in sources}
+        self.update_interval = {url: float(ClickMovementConfig.POLL_INTERVAL) for url in self.sources}
+        self.heap = [(now, url) for url in self.sources]
+        heapq.heapify(self.heap)
+
+    def poll_interval(self, url: str) -> float:
+        """Learned update interval scaled by source weight (weight 3 polls at the learned rate)"""
+        interval = self.update_interval[url] * 3 / max(1, self.sources[url]['weight'])
+        return min(max(interval, ClickMovementConfig.POLL_MIN_INTERVAL), ClickMovementConfig.POLL_MAX_INTERVAL)
+
+    def next_due(self) -> float:
+        return self.heap[0][0] if self.heap else time.time() + ClickMovementConfig.POLL_INTERVAL
+
+    def pop_due(self) -> List[Dict]:
+        now = time.time()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(self.sources[heapq.heappop(self.heap)[1]])
+        return due
+
+    def observe(self, url: str, published: List[float]):
+        """Fold the median gap between entry timestamps into the estimate and reschedule the feed"""
+        stamps = sorted(set(published), reverse=True)
+        if len(stamps) >= 2:
+            gap = statistics.median(a - b for a, b in zip(stamps, stamps[1:]))
+            self.update_interval[url] += self.SMOOTHING * (gap - self.update_interval[url])
+        heapq.heappush(self.heap, (time.time() + self.poll_interval(url), url))
+
+
+class FeedPoller:
+    """Standalone loop that keeps EntryStore current: `python app.py poll` (or `poll --once`)"""
+
+    def __init__(self, fetcher: Optional[NewsFetcher] = None):
+        self.fetcher = fetcher or NewsFetcher()
+        self.store = self.fetcher.store
+
+    def poll_once(self) -> int:
+        """One pass over every feed, then drop entries older than ENTRY_MAX_AGE (the cron entry point)"""
+        new_entries = self._poll(self.fetcher._get_sources(None))
+        self.store.prune()
+        return new_entries
+
+    def _poll(self, sources: List[Dict], scheduler: Optional[PollScheduler] = None) -> int:
+        articles = self.fetcher.fetch_sources(sources)
+        new_entries = self.store.add_entries(articles)
+        self.store.mark_polled()
+
+        if scheduler:
+            for source in sources:
+                scheduler.observe(source['rss'], [article['published'] for article in articles
+                                                  if article['feed_url'] == source['rss'] and article.get('published')])
+        return new_entries
+
+    def run_forever(self):
+        scheduler = PollScheduler(self.fetcher._get_sources(None))
+        last_prune = 0.0
+        while True:
+            time.sleep(max(0.0, scheduler.next_due() - time.time()))
+            due = scheduler.pop_due()
+            if not due:
+                continue
+
+            started = time.time()
+            new_entries = self._poll(due, scheduler)
+            if started - last_prune > ClickMovementConfig.POLL_INTERVAL:
+                self.store.prune()
+                last_prune = started
+
+            print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] polled {len(due)} feeds, {new_entries} new entries "
+                  f"in {time.time() - started:.1f}s", flush=True)
+
+# ============= HTML EXTRACTION =============
+ARTICLE_SELECTORS = ['article', '.article-body', '.entry-content', '.post-content', 'main']
+PAGE_CHROME = ['nav', 'header', 'footer']
+ARTICLE_IMAGE_SELECTOR = 'article img, .article-body img, .entry-content img'
+
+
+def css_to_xpath(selector: str) -> str:
+    """XPath for the tag and single-class selectors used above"""
+    if selector.startswith('.'):
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {selector[1:]} ')]"
+    return f'//{selector}'
+
+
+class SoupExtractor:
+    """Pure-Python BeautifulSoup backend; always available and the reference output"""
+
+    name = 'html.parser'
+
+    def parse(self, content: bytes, encoding: Optional[str] = None):
+        return BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+
+    @staticmethod
+    def _text(element) -> str:
+        # Newlines separate paragraphs in the extracted text, so none may survive inside one
+        return element.get_text(strip=True).replace('\n', ' ')
+
+    def article_text(self, soup) -> str:
+        """Paragraph text of the main article container, one paragraph per line"""
+        # Scripts and styles never hold images, so they can go; nav/header/footer stay in the
+        # shared document for the image extractor and are skipped here instead
+        for element in soup(['script', 'style']):
+            element.decompose()
+
+        for selector in ARTICLE_SELECTORS:
+            elements = [el for el in soup.select(selector) if not el.find_parent(PAGE_CHROME)]
+            if elements:
+                paragraphs = [p for p in elements[0].find_all(['p']) if not p.find_parent(PAGE_CHROME)]
+                text = '\n'.join([self._text(p) for p in paragraphs])
+                if len(text) > 500:
+                    return text
+
+        paragraphs = [p for p in soup.find_all('p') if not p.find_parent(PAGE_CHROME)]
+        return '\n'.join([t for t in (self._text(p) for p in paragraphs) if len(t) > 50])
+
+    def image_sources(self, soup) -> List[str]:
+        """Raw og:image, twitter:image and in-article <img> sources, in page order"""
+        sources = [tag.get('content') for tag in soup.find_all('meta', property='og:image')]
+        sources += [tag.get('content') for tag in soup.find_all('meta', attrs={'name': 'twitter:image'})]
+        sources += [img.get('data-src') or img.get('src') for img in soup.select(ARTICLE_IMAGE_SELECTOR)[:15]]
+        return sources
+
+
+class LxmlExtractor:
+    """libxml2-backed equivalent of SoupExtractor, used when lxml is installed"""
+
+    name = 'lxml'
+
+    ARTICLE_XPATHS = [css_to_xpath(selector) for selector in ARTICLE_SELECTORS]
+    IMAGE_XPATH = ' | '.join(css_to_xpath(part.split()[0]) + '//img' for part in ARTICLE_IMAGE_SELECTOR.split(', '))
+
+    def parse(self, content: bytes, encoding: Optional[str] = None):
+        parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+        return lxml_html.document_fromstring(content, parser=parser)
+
+    @staticmethod
+    def _in_chrome(element) -> bool:
+        return any(ancestor.tag in PAGE_CHROME for ancestor in element.iterancestors())
+
+    @staticmethod
+    def _text(element) -> str:
+        return ''.join(part.strip() for part in element.itertext()).replace('\n', ' ')
+
+    def article_text(self, doc) -> str:
+        lxml_etree.strip_elements(doc, 'script', 'style', with_tail=False)
+
+        for xpath in self.ARTICLE_XPATHS:
+            elements = [el for el in doc.xpath(xpath) if not self._in_chrome(el)]
+            if elements:
+                paragraphs = [p for p in elements[0].iter('p') if p is not elements[0] and not self._in_chrome(p)]
+                text = '\n'.join([self._text(p) for p in paragraphs])
+                if len(text) > 500:
+                    return text
+
+        paragraphs = [p for p in doc.iter('p') if not self._in_chrome(p)]
+        return '\n'.join([t for t in (self._text(p) for p in paragraphs) if len(t) > 50])
+
+    def image_sources(self, doc) -> List[str]:
+        sources = [tag.get('content') for tag in doc.xpath("//meta[@property='og:image']")]
+        sources += [tag.get('content') for tag in doc.xpath("//meta[@name='twitter:image']")]
+        sources += [img.get('data-src') or img.get('src') for img in doc.xpath(self.IMAGE_XPATH)[:15]]
+        return sources
+
+
+EXTRACTORS = {'html.parser': SoupExtractor()}
+if lxml_html:
+    EXTRACTORS['lxml'] = LxmlExtractor()
+
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
 
-        for theme in themes:
-            if theme.lower() in text:
-                score += 25
 
-        us_keywords = ['america', 'us ', 'u.s.', 'united states', 'washington', 'congress',
-                      'senate', 'house', 'trump', 'biden', 'republican', 'democrat',
-                      'border', 'immigration', 'texas', 'california', 'florida']
+def page_encoding(content_type: Optional[str], content: bytes) -> Optional[str]:
+    """Charset from the Content-Type header, else from a <meta charset> near the top of the page"""
+    match = re.search(r'charset=["\']?([\w-]+)', content_type or '', re.IGNORECASE)
+    if match:
+        return match.group(1).lower()
+    match = CHARSET_RE.search(content[:4096])
+    return match.group(1).decode('ascii').lower() if match else None
 
-        for keyword in us_keywords:
-            if keyword in text:
-                score += 15
+# ============= PAGE FETCHER =============
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+IMAGE_CONTENT_TYPES = ('image/',)
 
-        return score
+
+def download(url: str, timeout: float, max_bytes: int, content_types: Tuple[str, ...],
+             allow_partial: bool = False, done=None) -> Optional[Tuple[bytes, Optional[str], int]]:
+    """Streamed GET returning (body, content_type, status). The content type and declared length are
+    checked before any body is read; past max_bytes the body is cut off (allow_partial) or dropped.
+    done(lowered_body) may end the download early once the caller has everything it needs."""
+    try:
+        with requests.get(url, timeout=timeout, headers={'User-Agent': 'Mozilla/5.0'}, stream=True) as response:
+            content_type = response.headers.get('Content-Type')
+            if content_type and not content_type.lower().startswith(content_types):
+                return None
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > max_bytes and not allow_partial:
+                return None
+
+            body = bytearray()
+            lowered = bytearray()
+            for chunk in response.iter_content(ClickMovementConfig.DOWNLOAD_CHUNK_BYTES):
+                body += chunk
+                if len(body) > max_bytes:
+                    if not allow_partial:
+                        return None
+                    del body[max_bytes:]
+                    break
+                if done:
+                    lowered += chunk.lower()
+                    if done(lowered):
+                        break
+            return bytes(body), content_type, response.status_code
+    except Exception as e:
+        return None
+
+
+PARAGRAPH_TAG_RE = re.compile(rb'<p[\s>]')
+
+
+def article_complete(lowered: bytearray, min_paragraphs: int = 5) -> bool:
+    """True once the head (meta tags) and a closed <article> holding real paragraphs have arrived"""
+    if b'</head' not in lowered:
+        return False
+    end = lowered.find(b'</article')
+    while end != -1:
+        start = lowered.rfind(b'<article', 0, end)
+        # Teaser cards are <article>s too; only a block with several paragraphs counts as the body
+        # <path>, <picture> and <param> share the '<p' prefix, so match whole paragraph tags only
+        if start != -1 and len(PARAGRAPH_TAG_RE.findall(lowered, start, end)) >= min_paragraphs:
+            return True
+        end = lowered.find(b'</article', end + 1)
+    return False
+
+class PageFetcher:
+    """Downloads and parses an article page once so text and image extraction share the document"""
+
+    def __init__(self, extractor: Optional[str] = None):
+        self.extractor = EXTRACTORS.get(extractor or ClickMovementConfig.HTML_EXTRACTOR, EXTRACTORS['html.parser'])
+
+    def fetch(self, url: str, timeout: float = 10) -> Optional[Dict]:
+        downloaded = download(url, timeout, ClickMovementConfig.PAGE_MAX_BYTES, HTML_CONTENT_TYPES,
+                              allow_partial=True, done=article_complete)
+        if not downloaded:
+            return None
+        content, content_type, status = downloaded
+        # download() cuts a page off at exactly PAGE_MAX_BYTES; early stops on a complete article end sooner
+        return self.parse(url, content, content_type, status,
+                          truncated=len(content) >= ClickMovementConfig.PAGE_MAX_BYTES)
+
+    def parse_fragment(self, url: str, html: str) -> Optional[Dict]:
+        """Parse an article body delivered in a feed as if it were the page's <article> element"""
+        return self.parse(url, f'<html><body><article>{html}</article></body></html>'.encode('utf-8'),
+                          'text/html; charset=utf-8')
+
+    def parse(self, url: str, content: bytes, content_type: Optional[str] = None, status: int = 200,
+              truncated: bool = False) -> Optional[Dict]:
+        encoding = page_encoding(content_type, content)
+        for extractor in (self.extractor, EXTRACTORS['html.parser']):
+            try:
+                return {'url': url, 'status': status, 'truncated': truncated, 'extractor': extractor,
+                        'doc': extractor.parse(content, encoding)}
+            except Exception as e:
+                continue
+        return None
+
+class ScrapeCache(SQLiteStore):
+    """Cleaned article text and image candidates per canonical URL, with TTL and LRU size eviction"""
+
+    FILENAME = 'pages.sqlite3'
+
+    def _create(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scraped_pages (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content TEXT NOT NULL,
+                images TEXT NOT NULL,
+                status INTEGER,
+                extractor TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_scraped_accessed ON scraped_pages (accessed_at)')
+
+    def get(self, url: str) -> Optional[Dict]:
+        key = url_key(url)
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT url, content, images, status, extractor, fetched_at FROM scraped_pages '
+                    "WHERE url_key = ? AND fetched_at >= ? AND status = 200 AND content != ''",
+                    (key, time.time() - ClickMovementConfig.SCRAPE_CACHE_TTL)
+                ).fetchone()
+                if row:
+                    conn.execute('UPDATE scraped_pages SET accessed_at = ? WHERE url_key = ?', (time.time(), key))
+        except sqlite3.Error:
+            return None
+
+        if not row:
+            return None
+        return {'url': row[0], 'content': row[1], 'images': json.loads(row[2]), 'status': row[3],
+                'extractor': row[4], 'fetched_at': row[5]}
+
+    def put(self, url: str, content: str, images: Optional[List[str]], status: Optional[int] = 200,
+            extractor: Optional[str] = None, truncated: bool = False):
+        # Error pages, bot challenges and cut-off downloads must be retried, not pinned for the TTL
+        if status != 200 or not content or truncated:
+            return
+        images_json = json.dumps(images)
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO scraped_pages '
+                    '(url_key, url, content, images, status, extractor, fetched_at, accessed_at, size) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url_key(url), url, content, images_json, status, extractor, now, now,
+                     len(content.encode()) + len(images_json))
+                )
+                self._evict(conn, 'scraped_pages', 'url_key', 'fetched_at',
+                            ClickMovementConfig.SCRAPE_CACHE_TTL, ClickMovementConfig.SCRAPE_CACHE_MAX_BYTES)
+        except sqlite3.Error:
+            pass
+
+# ============= REWRITE CACHE =============
+class RewriteCache(SQLiteStore):
+    """Model responses keyed by a hash of everything that shapes them, shared by every session and
+    process on this machine, with TTL and LRU size eviction"""
+
+    FILENAME = 'rewrites.sqlite3'
+
+    def _create(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rewrites (
+                key TEXT PRIMARY KEY,
+                site TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_rewrites_accessed ON rewrites (accessed_at)')
+
+    @staticmethod
+    def key(source: str, site: str, prompt: str, model: str, temperature: float) -> str:
+        """Content address of a rewrite; the prompt text itself is the prompt version"""
+        prompt_version = hashlib.sha256(prompt.encode()).hexdigest()
+        return hashlib.sha256(json.dumps([source, site, prompt_version, model, temperature]).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT response FROM rewrites WHERE key = ? AND created_at >= ?',
+                                   (key, time.time() - ClickMovementConfig.REWRITE_CACHE_TTL)).fetchone()
+                if row:
+                    conn.execute('UPDATE rewrites SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def put(self, key: str, site: str, response: str):
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO rewrites (key, site, response, created_at, accessed_at, size) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, site, response, now, now, len(response.encode()))
+                )
+                self._evict(conn, 'rewrites', 'key', 'created_at',
+                            ClickMovementConfig.REWRITE_CACHE_TTL, ClickMovementConfig.REWRITE_CACHE_MAX_BYTES)
+        except sqlite3.Error:
+            pass
 
 # ============= CONTENT PROCESSOR =============
+class PromptCacheStats:
+    """Prompt cache counters fed from every rewrite's response usage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'uncached': 0, 'read_tokens': 0, 'written_tokens': 0, 'input_tokens': 0}
+
+    def record(self, usage):
+        read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        written = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        with self._lock:
+            # Prompts under the model's minimum cacheable length neither read nor write the cache
+            outcome = 'hits' if read else 'misses' if written else 'uncached'
+            self.counts[outcome] += 1
+            self.counts['read_tokens'] += read
+            self.counts['written_tokens'] += written
+            self.counts['input_tokens'] += getattr(usage, 'input_tokens', 0) or 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+@st.cache_resource
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """One set of counters per server process; Streamlit re-executes this module on every rerun,
+    so class attributes would reset while background rewrites keep reporting"""
+    return PromptCacheStats()
+
+
 class ContentProcessor:
     def __init__(self):
         self.client = anthropic.Anthropic(api_key=ClickMovementConfig.ANTHROPIC_KEY) if ClickMovementConfig.ANTHROPIC_KEY else None
         self.new_prompt_template = self._load_new_prompt_template()
+        self.rewrite_cache = RewriteCache()
+        self.cache_stats = get_prompt_cache_stats()
 
     def _load_new_prompt_template(self) -> str:
         """Load the new prompt template from prompt.md"""
@@ -339,67 +1601,54 @@ class ContentProcessor:
         except Exception as e:
             return ""
 
-    def scrape_article(self, url: str) -> str:
+    def scrape_article(self, url: str, timeout: float = 10, page: Optional[Dict] = None) -> str:
         try:
-            response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            for element in soup(['script', 'style', 'nav', 'header', 'footer']):
-                element.decompose()
-
-            selectors = ['article', '.article-body', '.entry-content', '.post-content', 'main']
-            for selector in selectors:
-                elements = soup.select(selector)
-                if elements:
-                    paragraphs = elements[0].find_all(['p'])
-                    text = ' '.join([p.get_text(strip=True) for p in paragraphs])
-                    if len(text) > 500:
-                        return self._deep_clean(text)
-
-            paragraphs = soup.find_all('p')
-            text = ' '.join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 50])
-            return self._deep_clean(text)
+            page = page or PageFetcher().fetch(url, timeout)
+            if not page:
+                return ""
+            return self._deep_clean(page['extractor'].article_text(page['doc']))
         except:
             return ""
 
+    # Every junk pattern in one alternation; boilerplate lines only match at the start of a paragraph
+    # and their tails stop at the paragraph break instead of eating the article
+    JUNK_RE = re.compile(r"""
+          ^\s*(?:
+              (?-i:[A-Z][a-z]+\s+[A-Z][a-z]+)\s+is\s+an?\s+(?:reporter|writer|correspondent)\b
+            | Story\ tips\ can\ be\ sent\ to
+            | CLICK\ HERE\ TO
+            | Subscribe\b[^\n]*?\bnewsletter
+            | Follow\s+(?:us|him|her|them|(?-i:[A-Z][\w.]*)(?:\s+(?-i:[A-Z][\w.]*))?)\s+on\s+
+              (?:Twitter|X|Facebook|Instagram|Truth\ Social|Threads|TikTok|YouTube)\b
+            | (?:©|\(c\)|Copyright\s*(?:©|\(c\)))\s*\d{4}
+            | Copyright\s+\d{4}(?=[^\n]*rights\ reserved|[^\n]{0,40}$)
+          )[^\n]*
+        | All\ rights\ reserved\.?
+        | @\w+
+        | \b(?:Fox\ News|CNN|MSNBC|Reuters|AP|BBC)\b
+    """, re.IGNORECASE | re.MULTILINE | re.VERBOSE)
+    PROMO_TERMS = ('click here', 'subscribe', 'follow us', 'contact us')
+
     def _deep_clean(self, text: str) -> str:
+        """Strip bylines, promos, handles and source names paragraph by paragraph (newline-separated)"""
         if not text:
             return ""
 
-        junk_patterns = [
-            r'[A-Z][a-z]+\s+[A-Z][a-z]+\s+is\s+a\s+(?:reporter|writer|correspondent).*',
-            r'Story tips can be sent to.*',
-            r'CLICK HERE TO.*',
-            r'Subscribe.*newsletter.*',
-            r'Follow.*on.*',
-            r'@[\w]+',
-            r'\s*\d{4}.*',
-            r'All [Rr]ights [Rr]eserved',
-        ]
-
-        for pattern in junk_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-
-        sources = ['Fox News', 'CNN', 'MSNBC', 'Reuters', 'AP', 'BBC']
-        for source in sources:
-            text = re.sub(rf'\b{source}\b', '', text, flags=re.IGNORECASE)
-
         lines = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line or len(line) < 20:
+        for line in self.JUNK_RE.sub('', text).split('\n'):
+            line = ' '.join(line.split())
+            if len(line) < 20:
                 continue
-            if any(x in line.lower() for x in ['click here', 'subscribe', 'follow', 'contact']):
+            # Short leftover lines that still carry promo wording are call-to-action boilerplate
+            if len(line) < 150 and any(term in line.lower() for term in self.PROMO_TERMS):
                 continue
             lines.append(line)
 
-        return ' '.join(lines).strip()
-
-    def rewrite_article(self, content: str, site_config: Dict) -> Tuple[str, List[str]]:
-        if not self.client or not content:
-            return "", []
+        return ' '.join(lines)
 
-        prompt = f"""Rewrite this news article following the TONE and PERSPECTIVE of {site_config['writer_style']}.
+    def _site_system_prompt(self, site_config: Dict) -> str:
+        """Fixed per-site rewrite instructions; identical on every call so the API can cache them"""
+        return f"""Rewrite the news article in the user's message following the TONE and PERSPECTIVE of {site_config['writer_style']}.
 
 CRITICAL RULES:
 - NO author bios or bylines
@@ -421,9 +1670,6 @@ TONE GUIDELINES:
 Target Audience: {site_config['target_audience']}
 Length: {ClickMovementConfig.MIN_WORDS}-{ClickMovementConfig.MAX_WORDS} words
 
-Article to rewrite:
-{content[:3000]}
-
 Generate 3 headline options and the rewritten article.
 
 HEADLINE REQUIREMENTS:
@@ -444,51 +1690,12 @@ ARTICLE:
 [rewritten content]
 """
 
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=3000,
-                temperature=0.7,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            text = response.content[0].text
-
-            headlines = []
-            article = ""
-
-            if "HEADLINES:" in text and "ARTICLE:" in text:
-                parts = text.split("ARTICLE:")
-                headline_section = parts[0].replace("HEADLINES:", "").strip()
-                article = parts[1].strip()
-
-                for line in headline_section.split('\n'):
-                    line = re.sub(r'^\d+\.\s*', '', line).strip()
-                    line = line.strip('"').strip("'")
-                    if line and len(line) > 10:
-                        headlines.append(line)
-
-            return article, headlines[:3]
-        except Exception as e:
-            st.error(f"Rewrite error: {str(e)}")
-            return "", []
-
-    def rewrite_article_new_prompt(self, content: str, original_title: str) -> Tuple[str, List[str]]:
-        """Rewrite article using the enhanced prompt.md template for American Conservatives"""
-        if not self.client or not content or not self.new_prompt_template:
-            return "", []
-
-        # Build the prompt using the template from prompt.md
-        # Replace the example article in the template with the actual content
-        prompt = f"""# ROLE
+    # Enhanced prompt.md instructions for American Conservatives; the article goes in the user message
+    NEW_PROMPT_SYSTEM = """# ROLE
 You're a U.S.–based political journalist known for writing with conviction — every story carries a clear stance and unmistakably human perspective. Your work is shaped by Republican conservative values: individual liberty, limited government, free-market capitalism, traditional social principles, and a strong national defense. You excel at blending emotional nuance with cultural context, crafting commentary that feels both authentic and relevant — the kind of writing that connects on instinct, not just ideology.
 
 # GOAL
-You will now write an article based on the following news source:
-
-{original_title}
-
-{content[:3500]}
+You will now write an article based on the news source in the user's message.
 
 NUMBER OF WORDS: 500
 
@@ -555,58 +1762,115 @@ ARTICLE:
 [rewritten content]
 """
 
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=3000,
-                temperature=0.8,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            text = response.content[0].text
-
-            headlines = []
-            article = ""
+    REWRITE_MODEL = "claude-sonnet-4-5-20250929"
+
+    def _create_rewrite(self, system: str, user: str, temperature: float, site: str,
+                        on_text: Optional[Callable[[str], None]] = None) -> str:
+        """Call the model with the static instructions as a cached system block and record cache usage.
+        With on_text the response is streamed and on_text receives the text so far after every delta.
+        A response already in the rewrite cache for the same source, site, prompt, model and
+        temperature is returned without a call"""
+        cache_key = RewriteCache.key(user, site, system, self.REWRITE_MODEL, temperature)
+        cached = self.rewrite_cache.get(cache_key)
+        if cached:
+            if on_text:
+                on_text(cached)
+            return cached
+
+        text = self._call_model(system, user, temperature, on_text)
+        # Only complete, parseable rewrites are worth keeping
+        if all(self._parse_rewrite(text)):
+            self.rewrite_cache.put(cache_key, site, text)
+        return text
+
+    def _call_model(self, system: str, user: str, temperature: float,
+                    on_text: Optional[Callable[[str], None]] = None) -> str:
+        request = dict(
+            model=self.REWRITE_MODEL,
+            max_tokens=3000,
+            temperature=temperature,
+            system=[{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+            messages=[{"role": "user", "content": user}]
+        )
+        if not on_text:
+            response = self.client.messages.create(**request)
+            self._record_cache_usage(response.usage)
+            return response.content[0].text
+
+        text = ""
+        with self.client.messages.stream(**request) as stream:
+            for delta in stream.text_stream:
+                text += delta
+                on_text(text)
+            self._record_cache_usage(stream.get_final_message().usage)
+        return text
+
+    def _record_cache_usage(self, usage):
+        self.cache_stats.record(usage)
+
+    @staticmethod
+    def _parse_rewrite(text: str) -> Tuple[str, List[str]]:
+        """(article, headlines) from a complete or partial response; both stay empty until ARTICLE: arrives"""
+        headlines = []
+        article = ""
+
+        if "HEADLINES:" in text and "ARTICLE:" in text:
+            parts = text.split("ARTICLE:")
+            headline_section = parts[0].replace("HEADLINES:", "").strip()
+            article = parts[1].strip()
+
+            for line in headline_section.split('\n'):
+                line = re.sub(r'^\d+\.\s*', '', line).strip()
+                line = line.strip('"').strip("'")
+                if line and len(line) > 10:
+                    headlines.append(line)
+
+        return article, headlines[:3]
+
+    def rewrite_article(self, content: str, site_config: Dict,
+                        on_text: Optional[Callable[[str], None]] = None) -> Tuple[str, List[str]]:
+        if not self.client or not content:
+            return "", []
 
-            if "HEADLINES:" in text and "ARTICLE:" in text:
-                parts = text.split("ARTICLE:")
-                headline_section = parts[0].replace("HEADLINES:", "").strip()
-                article = parts[1].strip()
+        try:
+            text = self._create_rewrite(self._site_system_prompt(site_config),
+                                        f"Article to rewrite:\n{content[:3000]}", temperature=0.7,
+                                        site=site_config['name'], on_text=on_text)
+            return self._parse_rewrite(text)
+        except Exception as e:
+            st.error(f"Rewrite error: {str(e)}")
+            return "", []
 
-                for line in headline_section.split('\n'):
-                    line = re.sub(r'^\d+\.\s*', '', line).strip()
-                    line = line.strip('"').strip("'")
-                    if line and len(line) > 10:
-                        headlines.append(line)
+    def rewrite_article_new_prompt(self, content: str, original_title: str,
+                                   on_text: Optional[Callable[[str], None]] = None) -> Tuple[str, List[str]]:
+        """Rewrite article using the enhanced prompt.md template for American Conservatives"""
+        if not self.client or not content or not self.new_prompt_template:
+            return "", []
 
-            return article, headlines[:3]
+        try:
+            text = self._create_rewrite(self.NEW_PROMPT_SYSTEM, f"{original_title}\n\n{content[:3500]}",
+                                        temperature=0.8,
+                                        site=ClickMovementConfig.WORDPRESS_SITES['american_conservatives']['name'],
+                                        on_text=on_text)
+            return self._parse_rewrite(text)
         except Exception as e:
             st.error(f"New prompt rewrite error: {str(e)}")
             return "", []
 
 # ============= IMAGE FETCHER =============
 class ImageFetcher:
-    def fetch_images(self, url: str) -> List[str]:
+    def fetch_images(self, url: str, timeout: float = 10, page: Optional[Dict] = None,
+                     feed_images: Optional[List[str]] = None) -> List[str]:
+        """Feed media images first, then the page's; the page is only downloaded when the feed had none"""
         try:
-            response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            images = []
-
-            for tag in soup.find_all('meta', property='og:image'):
-                img_url = tag.get('content')
-                if img_url and self._is_valid_image(img_url):
-                    images.append(urljoin(url, img_url))
+            images = [img_url for img_url in feed_images or [] if self._is_valid_image(img_url)]
+            if not images:
+                page = page or PageFetcher().fetch(url, timeout)
 
-            for tag in soup.find_all('meta', attrs={'name': 'twitter:image'}):
-                img_url = tag.get('content')
-                if img_url and self._is_valid_image(img_url):
-                    images.append(urljoin(url, img_url))
-
-            for img in soup.select('article img, .article-body img, .entry-content img')[:15]:
-                src = img.get('data-src') or img.get('src')
-                if src and self._is_valid_image(src):
-                    images.append(urljoin(url, src))
+            if page:
+                for img_url in page['extractor'].image_sources(page['doc']):
+                    if img_url and self._is_valid_image(img_url):
+                        images.append(urljoin(url, img_url))
 
             seen = set()
             unique_images = []
@@ -631,11 +1895,11 @@ class ImageFetcher:
 
     def resize_image(self, image_url: str) -> Optional[BytesIO]:
         try:
-            response = requests.get(image_url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-            if response.status_code != 200:
+            downloaded = download(image_url, 10, ClickMovementConfig.IMAGE_MAX_BYTES, IMAGE_CONTENT_TYPES)
+            if not downloaded or downloaded[2] != 200:
                 return None
 
-            img = Image.open(BytesIO(response.content))
+            img = Image.open(BytesIO(downloaded[0]))
 
             if img.mode in ('RGBA', 'LA', 'P'):
                 img = img.convert('RGB')
@@ -899,14 +2163,45 @@ class WordPressPublisher:
             return []
 
 # ============= MAIN PROCESSOR =============
+class PipelineStats:
+    """Per-stage candidate counts and wall time for one fetch run; stages are listed cheapest first"""
+
+    STAGES = ['canonical_dedup', 'title_filter', 'url_hash', 'scrape', 'word_count', 'content_hash', 'images']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {stage: {'checked': 0, 'dropped': 0, 'seconds': 0.0} for stage in self.STAGES}
+
+    def record(self, stage: str, started: float, checked: int = 1, dropped: int = 0):
+        with self._lock:
+            entry = self.stages[stage]
+            entry['checked'] += checked
+            entry['dropped'] += dropped
+            entry['seconds'] += time.time() - started
+
+    def report(self) -> List[Dict]:
+        with self._lock:
+            return [{'stage': stage, **entry, 'seconds': round(entry['seconds'], 3)}
+                    for stage, entry in self.stages.items()]
+
+
 class NewsProcessor:
+    # Non-article formats that rarely survive the word-count filter, labelled as such at either end of
+    # the raw headline ("VIDEO: ...", "... | Live updates"); rejected before any download
+    TITLE_REJECT_RE = re.compile(r'^\s*(?:watch|video|podcast|live(?:\s+updates)?|photos?|gallery|quiz|listen)'
+                                 r'(?:\s*:|\s+[|\-–—]\s)|(?::|\s[|\-–—])\s*live\s+updates\s*$', re.IGNORECASE)
+    MIN_TITLE_WORDS = 3
+
     def __init__(self):
         self.db = SupabaseDatabase()
         self.fetcher = NewsFetcher()
         self.processor = ContentProcessor()
         self.images = ImageFetcher()
+        self.pages = PageFetcher()
+        self.scrape_cache = ScrapeCache()
         self.publisher = WordPressPublisher()
         self.used_urls = set()
+        self.last_report = {}
 
     def _generate_tags(self, article_title: str, content: str, site_config: Dict) -> List[str]:
         tags = []
@@ -955,55 +2250,377 @@ class NewsProcessor:
 
         return tags[:5]
 
-    def process_articles_global(self, num_articles: int = 40) -> List[Dict]:
-        processed = []
+    def matching_sites(self, article: Dict) -> List[str]:
+        """Sites whose themes pull in the feed this article came from"""
+        matches = []
+        for site_key, site_config in ClickMovementConfig.WORDPRESS_SITES.items():
+            if article['source'] in {source['name'] for source in self.fetcher._get_sources(site_config['themes'])}:
+                matches.append(site_key)
+        return matches
+
+    def rewrite_for_site(self, article: Dict, site_key: str, use_new_prompt: bool = False,
+                         on_text: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
+        """One site's rewrite of the article as stored in article_rewrites, or None if the rewrite failed"""
+        site_config = ClickMovementConfig.WORDPRESS_SITES[site_key]
+        # The new prompt.md template only applies to American Conservatives
+        if use_new_prompt and site_key == 'american_conservatives':
+            content, headlines = self.processor.rewrite_article_new_prompt(article['raw_content'],
+                                                                           article['original_title'], on_text=on_text)
+        else:
+            content, headlines = self.processor.rewrite_article(article['raw_content'], site_config, on_text=on_text)
+
+        if not (content and headlines):
+            return None
+        return {
+            'content': content,
+            'headlines': headlines,
+            'tags': self._generate_tags(article['original_title'], content, site_config)
+        }
+
+    def process_articles_global(self, num_articles: int = 40, time_budget: Optional[float] = None) -> List[Dict]:
+        """Best articles gathered within time_budget seconds; see self.last_report for what was cut short"""
+        deadline = Deadline(time_budget)
 
         all_themes = set()
         for site_config in ClickMovementConfig.WORDPRESS_SITES.values():
             all_themes.update(site_config['themes'])
 
-        articles = self.fetcher.fetch_articles(list(all_themes), limit=num_articles * 5)
+        # Feeds stream in on a helper thread so scraping starts while slower feeds are still in flight
+        batches = queue.Queue()
 
-        for article in articles:
-            if len(processed) >= num_articles:
-                break
+        def consume_feeds():
+            try:
+                for batch in self.fetcher.stream_articles(list(all_themes), limit=num_articles * 5, deadline=deadline):
+                    batches.put(batch)
+            finally:
+                batches.put(None)
+
+        threading.Thread(target=consume_feeds, daemon=True).start()
+
+        pending = []  # heap of (-score, arrival, article)
+        arrival = itertools.count()
+        stats = PipelineStats()
+        seen = {'urls': set(), 'titles': set()}
+        in_flight = {}  # future -> (rank, domain)
+        domain_active = {}
+        processed = []
+        feeds_done = False
+        executor = ThreadPoolExecutor(max_workers=ClickMovementConfig.SCRAPE_WORKERS)
+
+        try:
+            while True:
+                feeds_done = self._drain_batches(batches, pending, arrival, stats, seen, deadline) or feeds_done
 
-            if article['link'] in self.used_urls:
+                if deadline.expired():
+                    if in_flight or (pending and len(processed) < num_articles):
+                        deadline.cut('scrape')
+                    break
+
+                # Stop dispatching once enough good articles are in hand
+                if len(processed) < num_articles:
+                    self._dispatch(executor, pending, in_flight, domain_active, deadline, stats)
+
+                if not in_flight:
+                    if len(processed) >= num_articles or (feeds_done and not pending):
+                        break
+                    # Nothing left to scrape yet: block until the next feed batch arrives
+                    feeds_done = self._drain_batches(batches, pending, arrival, stats, seen, deadline,
+                                                     wait_for=deadline.timeout(1)) or feeds_done
+                    continue
+
+                done, _ = wait(in_flight, timeout=deadline.timeout(0.2), return_when=FIRST_COMPLETED)
+                for future in done:
+                    rank, domain = in_flight.pop(future)
+                    domain_active[domain] -= 1
+                    try:
+                        result = future.result()
+                    except Exception:
+                        result = None
+                    if result:
+                        processed.append((rank, result))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.last_report = {
+            'time_budget': time_budget,
+            'elapsed': round(time.time() - deadline.started, 1),
+            'cut_short': deadline.cut_stages,
+            'articles': min(len(processed), num_articles),
+            'stages': stats.report()
+        }
+
+        processed.sort(key=lambda x: x[0])
+        return [result for _, result in processed[:num_articles]]
+
+    def _drain_batches(self, batches: queue.Queue, pending: List, arrival: Iterator[int], stats: PipelineStats,
+                       seen: Dict, deadline: Deadline, wait_for: float = 0) -> bool:
+        """Move streamed feed batches through the pre-download stages into the pending heap;
+        True once the feed stream has finished"""
+        while True:
+            try:
+                batch = batches.get(timeout=wait_for) if wait_for else batches.get_nowait()
+            except queue.Empty:
+                return False
+            wait_for = 0
+            if batch is None:
+                return True
+
+            batch = self._filter_canonical(batch, stats, seen['urls'])
+            batch = self._filter_titles(batch, stats, seen['titles'])
+            if not batch:
                 continue
 
-            # Scrape but DON'T rewrite yet - store raw content
-            full_content = self.processor.scrape_article(article['link'])
-            if not full_content or len(full_content.split()) < 150:
+            # URLs already published for any site need no scrape; one batched lookup per feed batch
+            started = time.time()
+            sites = list(ClickMovementConfig.WORDPRESS_SITES.keys())
+            duplicates = self.db.find_duplicates([(article['link'], None) for article in batch], sites,
+                                                 aliases={article['link']: article.get('raw_link') for article in batch},
+                                                 deadline=deadline)
+            fresh = [article for article in batch if not any(duplicates[article['link']].values())]
+            stats.record('url_hash', started, len(batch), len(batch) - len(fresh))
+
+            for article in fresh:
+                heapq.heappush(pending, (-article['score'], next(arrival), article))
+
+    def _filter_canonical(self, batch: List[Dict], stats: PipelineStats, seen_urls: set) -> List[Dict]:
+        """Drop URLs already queued this run or already shown this session"""
+        started = time.time()
+        kept = []
+        for article in batch:
+            key = url_key(article['link'])
+            if key in seen_urls or article['link'] in self.used_urls:
+                continue
+            seen_urls.add(key)
+            kept.append(article)
+        stats.record('canonical_dedup', started, len(batch), len(batch) - len(kept))
+        return kept
+
+    def _filter_titles(self, batch: List[Dict], stats: PipelineStats, seen_titles: set) -> List[Dict]:
+        """Drop non-article formats, stub titles and the same headline syndicated under another URL"""
+        started = time.time()
+        kept = []
+        for article in batch:
+            if self.TITLE_REJECT_RE.search(article.get('title', '')):
+                continue
+            title = re.sub(r'\W+', ' ', article.get('title', '').lower()).strip()
+            if len(title.split()) < self.MIN_TITLE_WORDS:
+                continue
+            if title in seen_titles:
+                continue
+            seen_titles.add(title)
+            kept.append(article)
+        stats.record('title_filter', started, len(batch), len(batch) - len(kept))
+        return kept
+
+    def _dispatch(self, executor: ThreadPoolExecutor, pending: List, in_flight: Dict,
+                  domain_active: Dict, deadline: Deadline, stats: PipelineStats):
+        """Submit the best pending candidates, at most SCRAPE_PER_DOMAIN at a time per publisher"""
+        blocked = []
+        while pending and len(in_flight) < ClickMovementConfig.SCRAPE_WORKERS:
+            item = heapq.heappop(pending)
+            domain = url_key(item[2]['link']).split('/', 1)[0]
+            if domain_active.get(domain, 0) >= ClickMovementConfig.SCRAPE_PER_DOMAIN:
+                blocked.append(item)
                 continue
+            domain_active[domain] = domain_active.get(domain, 0) + 1
+            future = executor.submit(self._process_candidate, item[2], deadline, stats)
+            in_flight[future] = (item[:2], domain)
 
-            is_dup = False
-            for site_key in ClickMovementConfig.WORDPRESS_SITES.keys():
-                if self.db.is_duplicate(article['link'], full_content, site_key):
-                    is_dup = True
-                    break
+        for item in blocked:
+            heapq.heappush(pending, item)
 
-            if is_dup:
-                continue
+    def _process_candidate(self, article: Dict, deadline: Deadline, stats: PipelineStats) -> Optional[Dict]:
+        """Post-download stages for one candidate: scrape, word count, content hash, images"""
+        if article['link'] in self.used_urls:
+            return None
 
-            image_urls = self.images.fetch_images(article['link'])
-
-            processed.append({
-                'original_title': article['title'],
-                'raw_content': full_content,  # Store raw, not rewritten
-                'source': article['source'],
-                'url': article['link'],
-                'images': image_urls,
-                'image_page': 0,
-                'word_count': len(full_content.split()),
-                'is_us_source': article.get('is_us', False),
-                'rewrites': {}  # Will store {site_key: {'content': ..., 'headlines': ...}}
-            })
+        started = time.time()
+        scraped = self._scrape(article, deadline)
+        stats.record('scrape', started, dropped=0 if scraped else 1)
+        if not scraped:
+            return None
 
-            self.used_urls.add(article['link'])
+        started = time.time()
+        full_content = scraped['content']
+        word_count = len(full_content.split()) if full_content else 0
+        stats.record('word_count', started, dropped=0 if word_count >= 150 else 1)
+        if word_count < 150:
+            self._cache_scrape(article['link'], scraped, None)
+            return None
+
+        started = time.time()
+        sites = list(ClickMovementConfig.WORDPRESS_SITES.keys())
+        duplicates = self.db.find_duplicates([(article['link'], full_content)], sites,
+                                             aliases={article['link']: article.get('raw_link')},
+                                             deadline=deadline)
+        is_duplicate = any(duplicates[article['link']].values())
+        stats.record('content_hash', started, dropped=1 if is_duplicate else 0)
+        if is_duplicate:
+            self._cache_scrape(article['link'], scraped, None)
+            return None
 
-        return processed
+        started = time.time()
+        image_urls = scraped['images']
+        if image_urls is None:
+            image_urls = self.images.fetch_images(article['link'], page=scraped['page'],
+                                                  feed_images=article.get('images'))
+            if not image_urls and scraped.get('from_feed'):
+                # The feed body had no pictures; the page's og:image is still worth one download
+                page = self.pages.fetch(article['link'], timeout=deadline.timeout(10))
+                image_urls = self.images.fetch_images(article['link'], page=page) if page else []
+            self._cache_scrape(article['link'], scraped, image_urls)
+        stats.record('images', started)
+
+        self.used_urls.add(article['link'])
+
+        return {
+            'original_title': article['title'],
+            'raw_content': full_content,  # Store raw, not rewritten
+            'source': article['source'],
+            'url': article['link'],
+            'images': image_urls,
+            'image_page': 0,
+            'word_count': word_count,
+            'is_us_source': article.get('is_us', False),
+            'score': article['score'],
+            'rewrites': {}  # Will store {site_key: {'content': ..., 'headlines': ...}}
+        }
+
+    def _scrape(self, article: Dict, deadline: Deadline) -> Optional[Dict]:
+        """Cleaned text for the article: from the scrape cache, from a full-text feed body, or from
+        the page. A parsed document is kept so image extraction can run later without a second
+        fetch; images is None until then"""
+        url = article['link']
+        cached = self.scrape_cache.get(url)
+        if cached:
+            return {'content': cached['content'], 'images': cached['images'], 'page': None}
+
+        if article.get('content'):
+            page = self.pages.parse_fragment(url, article['content'])
+            content = self.processor.scrape_article(url, page=page) if page else ''
+            if len(content.split()) >= 150:
+                return {'content': content, 'images': None, 'page': page, 'from_feed': True}
+
+        page = self.pages.fetch(url, timeout=deadline.timeout(10))
+        if not page:
+            return None
+
+        # Scrape but DON'T rewrite yet - store raw content
+        return {'content': self.processor.scrape_article(url, page=page), 'images': None, 'page': page}
+
+    def _cache_scrape(self, url: str, scraped: Dict, images: Optional[List[str]]):
+        """Store a freshly downloaded page's text. Rejected candidates are stored with images=None
+        (never extracted, as opposed to none found), and only when the whole page came back 200 with text"""
+        page = scraped['page']
+        if page and page['status'] == 200 and scraped['content']:
+            self.scrape_cache.put(url, scraped['content'], images, page['status'], page['extractor'].name,
+                                  truncated=page['truncated'])
+
+# ============= REWRITE WORKER =============
+class RewriteWorker:
+    """Pre-generates site rewrites for a fetched batch on background threads, best articles first.
+    Kept in st.session_state; each script run collects whatever has finished"""
+
+    def __init__(self, processor: NewsProcessor, articles: List[Dict], use_new_prompt: bool = False):
+        self.processor = processor
+        self.executor = ThreadPoolExecutor(max_workers=ClickMovementConfig.REWRITE_WORKERS)
+        self.futures = {}  # (article index, site_key) -> Future
+
+        # articles arrive sorted by score, so submission order is priority order
+        for idx, article in enumerate(articles[:ClickMovementConfig.REWRITE_PREFETCH_ARTICLES]):
+            for site_key in processor.matching_sites(article):
+                self.futures[(idx, site_key)] = self.executor.submit(
+                    processor.rewrite_for_site, article, site_key, use_new_prompt)
+        self.executor.shutdown(wait=False)
+
+    def pending(self, idx: int, site_key: str) -> bool:
+        future = self.futures.get((idx, site_key))
+        return bool(future) and not future.done()
+
+    def collect(self) -> Dict[Tuple[int, str], Dict]:
+        """Finished rewrites, keyed by (article index, site_key)"""
+        results = {}
+        for key, future in list(self.futures.items()):
+            if future.done() and not future.cancelled():
+                try:
+                    rewrite = future.result()
+                except Exception:
+                    rewrite = None
+                if rewrite:
+                    results[key] = rewrite
+        return results
+
+    def progress(self) -> Tuple[int, int]:
+        return sum(1 for future in self.futures.values() if future.done()), len(self.futures)
+
+    def cancel(self):
+        for future in self.futures.values():
+            future.cancel()
 
 # ============= DASHBOARD FUNCTIONS =============
+@st.fragment(run_every=3)
+def show_rewrite_progress():
+    """Background rewrite progress; reruns the whole page when new rewrites land so the cards show them"""
+    worker = st.session_state.rewrite_worker
+    if not worker:
+        return
+
+    # A full rerun redraws every card, so batch finished rewrites: one rerun per interval, plus one at the end
+    done, total = worker.progress()
+    due = time.time() - st.session_state.get('rewrites_rerun_at', 0) >= ClickMovementConfig.REWRITE_RERUN_INTERVAL
+    if done > st.session_state.get('rewrites_shown', 0) and (due or done == total):
+        st.session_state.rewrites_rerun_at = time.time()
+        st.rerun(scope="app")
+    if done < total:
+        st.progress(done / total, text=f"Pre-generating rewrites: {done}/{total}")
+
+
+@st.cache_data(ttl=3600, max_entries=300, show_spinner=False)
+def preview_image_bytes(img_url: str) -> bytes:
+    """Card preview as a small JPEG thumbnail, downloaded once per hour instead of on every rerun;
+    only the thumbnail is cached, never the full download"""
+    downloaded = download(img_url, 5, ClickMovementConfig.IMAGE_MAX_BYTES, IMAGE_CONTENT_TYPES)
+    if not downloaded:
+        # Raise rather than return None so a failed download isn't cached
+        raise ValueError(f"Image download failed: {img_url}")
+
+    img = Image.open(BytesIO(downloaded[0]))
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.thumbnail((ClickMovementConfig.PREVIEW_MAX_SIDE, ClickMovementConfig.PREVIEW_MAX_SIDE))
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=80)
+    return output.getvalue()
+
+
+def stream_rewrite_preview(article: Dict, site_key: str, style_label: str) -> Optional[Dict]:
+    """Run one rewrite with the response streamed into an open preview expander: headlines as soon as
+    the HEADLINES block is complete, then the article body as it is written"""
+    site_config = ClickMovementConfig.WORDPRESS_SITES[site_key]
+    with st.expander(f"{site_config['name']} ({style_label} style) - writing...", expanded=True):
+        headline_slot = st.empty()
+        body_slot = st.empty()
+        headline_slot.caption("Waiting for headlines...")
+
+    last_update = [0.0]
+
+    def on_text(text: str):
+        # Redraw at most ~5 times a second; every delta would flood the browser connection
+        if time.time() - last_update[0] < 0.2:
+            return
+        last_update[0] = time.time()
+        body, headlines = ContentProcessor._parse_rewrite(text)
+        if headlines:
+            headline_slot.markdown('\n'.join(f"{n}. {headline}" for n, headline in enumerate(headlines, 1)))
+        if body:
+            body_slot.markdown(f'<div class="preview-box">{body}</div>', unsafe_allow_html=True)
+
+    rewrite = NewsProcessor().rewrite_for_site(article, site_key, st.session_state.use_new_prompt, on_text=on_text)
+    if not rewrite:
+        headline_slot.warning("Rewrite failed")
+    return rewrite
+
+
 def show_google_sheets_view():
     """Exact replica of Google Sheets table"""
     st.markdown("## Google Sheets View")
@@ -1160,6 +2777,226 @@ def show_analytics_dashboard():
     top_days = df.nlargest(10, 'open_rate')[['date', 'brand', 'sends', 'open_rate', 'ctr']]
     st.dataframe(top_days, use_container_width=True)
 
+# ============= BENCHMARKS =============
+def _substring_score(entry: Dict, themes: List[str], weight: int) -> int:
+    """Previous NewsFetcher._score, kept as the benchmark baseline"""
+    score = weight * 10
+    text = f"{entry.get('title', '')} {entry.get('summary', '')}".lower()
+    for theme in themes:
+        if theme.lower() in text:
+            score += 25
+    for keyword in ['america', 'us ', 'u.s.', 'united states', 'washington', 'congress',
+                    'senate', 'house', 'trump', 'biden', 'republican', 'democrat',
+                    'border', 'immigration', 'texas', 'california', 'florida']:
+        if keyword in text:
+            score += 15
+    return score
+
+
+def benchmark_scorer(num_entries: int = 5000, seed: int = 42) -> Dict:
+    """Compare the compiled KeywordScorer against the substring baseline on synthetic entries"""
+    rng = random.Random(seed)
+    vocabulary = ['senate', 'warehouse', 'famous', 'house', 'Trump', 'Biden', 'border', 'economy',
+                  'world', 'Congress', 'Democrats', 'Republicans', 'U.S.', 'markets', 'Texas',
+                  'America', 'freedom', 'culture', 'election', 'immigration', 'global', 'the', 'a',
+                  'of', 'in', 'said', 'officials', 'report', 'new', 'policy', 'vote', 'week']
+    entries = [{'title': ' '.join(rng.choices(vocabulary, k=10)),
+                'summary': ' '.join(rng.choices(vocabulary, k=40))} for _ in range(num_entries)]
+    weights = [rng.randint(2, 15) for _ in range(num_entries)]
+
+    themes = set()
+    for site_config in ClickMovementConfig.WORDPRESS_SITES.values():
+        themes.update(site_config['themes'])
+    themes = sorted(themes)
+
+    started = time.perf_counter()
+    baseline = [_substring_score(entry, themes, weight) for entry, weight in zip(entries, weights)]
+    baseline_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scorer = KeywordScorer(themes)
+    compiled = [scorer.score(entry, weight) for entry, weight in zip(entries, weights)]
+    compiled_seconds = time.perf_counter() - started
+
+    return {
+        'entries': num_entries,
+        'baseline_per_sec': round(num_entries / baseline_seconds),
+        'compiled_per_sec': round(num_entries / compiled_seconds),
+        'speedup': round(baseline_seconds / compiled_seconds, 2),
+        'scores_changed': sum(1 for a, b in zip(baseline, compiled) if a != b)
+    }
+
+
+def synthetic_pages(num_pages: int = 40, seed: int = 7) -> List[Tuple[str, bytes]]:
+    """Reproducible news-like pages for bench-extract: site chrome, inline scripts, teaser cards,
+    comment threads and the article under each container ARTICLE_SELECTORS knows, or none at all"""
+    rng = random.Random(seed)
+    words = ['senators', 'border', 'funding', 'bill', 'vote', 'officials', 'said', 'Tuesday', 'the', 'a',
+             'economy', 'markets', 'election', 'Congress', 'governor', 'policy', 'report', 'week', 'of', 'in',
+             'café', 'résumé', 'amid', 'debate', 'aides', 'expect', 'final', 'recess', 'court', 'ruling']
+    containers = [('<article>', '</article>'), ('<div class="article-body">', '</div>'),
+                  ('<div class="post entry-content">', '</div>'), ('<main>', '</main>'), ('<div>', '</div>')]
+
+    def sentence(length: int) -> str:
+        return ' '.join(rng.choices(words, k=length)).capitalize() + '.'
+
+    pages = []
+    for n in range(num_pages):
+        open_tag, close_tag = containers[n % len(containers)]
+        charset = 'windows-1252' if n % 7 == 0 else 'utf-8'
+        chrome = ''.join(f'<a href="/s/{i}">{sentence(2)}</a>' for i in range(rng.randint(20, 60)))
+        teasers = ''.join(f'<div class="card"><article><p>{sentence(8)}</p></article></div>' for _ in range(3))
+        body = ''.join(f'<p>{sentence(rng.randint(12, 40))}</p>' for _ in range(rng.randint(8, 30)))
+        body += ''.join(f'<figure><img src="/img/{n}-{i}.jpg" data-src="https://cdn.example.com/{n}-{i}.jpg">'
+                        f'</figure>' for i in range(rng.randint(0, 4)))
+        comments = ''.join(f'<li><p>{sentence(rng.randint(5, 20))}</p></li>' for _ in range(rng.randint(0, 40)))
+        page = (f'<!doctype html><html><head><meta charset="{charset}">'
+                f'<meta property="og:image" content="/og{n}.jpg"><meta name="twitter:image" content="https://cdn/tw{n}.jpg">'
+                f'<script>{"var x = 1;" * rng.randint(50, 500)}</script><style>p {{ margin: 0 }}</style></head>'
+                f'<body><header><nav>{chrome}</nav><p>{sentence(6)}</p></header>{teasers}'
+                f'{open_tag}<h1>{sentence(8)}</h1>{body}{close_tag}'
+                f'<section class="comments"><ul>{comments}</ul></section>'
+                f'<footer><p>{sentence(10)}</p>{chrome}</footer></body></html>')
+        pages.append((f'synthetic-{n:03d}.html', page.encode(charset, errors='replace')))
+    return pages
+
+
+def benchmark_extraction(corpus_dir: Optional[str] = None, repeats: int = 3) -> Dict:
+    """Time each HTML extractor over saved pages (*.html in corpus_dir, else synthetic_pages())
+    and count pages whose output matches html.parser"""
+    pages = []
+    if corpus_dir:
+        for name in sorted(os.listdir(corpus_dir)):
+            if name.endswith(('.html', '.htm')):
+                with open(os.path.join(corpus_dir, name), 'rb') as f:
+                    pages.append((name, f.read()))
+    else:
+        pages = synthetic_pages()
+
+    result = {'pages': len(pages), 'megabytes': round(sum(len(c) for _, c in pages) / 1e6, 2), 'extractors': {}}
+    reference = {}
+    for extractor in EXTRACTORS.values():
+        outputs = {}
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for name, content in pages:
+                doc = extractor.parse(content, page_encoding(None, content))
+                images = extractor.image_sources(doc)
+                outputs[name] = (extractor.article_text(doc), images)
+        seconds = (time.perf_counter() - started) / repeats
+
+        reference = reference or outputs
+        result['extractors'][extractor.name] = {
+            'pages_per_sec': round(len(pages) / seconds, 1) if seconds else None,
+            'same_text': sum(1 for name in outputs if outputs[name][0] == reference[name][0]),
+            'same_images': sum(1 for name in outputs if outputs[name][1] == reference[name][1])
+        }
+    return result
+
+
+def _legacy_deep_clean(text: str) -> str:
+    """Previous ContentProcessor._deep_clean, kept as the benchmark baseline"""
+    if not text:
+        return ""
+    for pattern in [r'[A-Z][a-z]+\s+[A-Z][a-z]+\s+is\s+a\s+(?:reporter|writer|correspondent).*',
+                    r'Story tips can be sent to.*', r'CLICK HERE TO.*', r'Subscribe.*newsletter.*',
+                    r'Follow.*on.*', r'@[\w]+', r'\s*\d{4}.*', r'All [Rr]ights [Rr]eserved']:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    for source in ['Fox News', 'CNN', 'MSNBC', 'Reuters', 'AP', 'BBC']:
+        text = re.sub(rf'\b{source}\b', '', text, flags=re.IGNORECASE)
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or len(line) < 20:
+            continue
+        if any(x in line.lower() for x in ['click here', 'subscribe', 'follow', 'contact']):
+            continue
+        lines.append(line)
+    return ' '.join(lines).strip()
+
+
+# (scraped text with one paragraph per line, expected cleaner output)
+CLEANER_REGRESSION_CASES = [
+    ("The bill passed in 2024 after months of debate in the chamber.\n"
+     "Senators said the final vote was close and the outcome uncertain.",
+     "The bill passed in 2024 after months of debate in the chamber. "
+     "Senators said the final vote was close and the outcome uncertain."),
+    ("Senators met Tuesday to debate the new border funding bill.\n"
+     "John Smith is a reporter covering Congress. Story tips can be sent to the desk.",
+     "Senators met Tuesday to debate the new border funding bill."),
+    ("Officials told Reuters that @SenSmith would vote against the measure tomorrow.",
+     "Officials told that would vote against the measure tomorrow."),
+    ("CLICK HERE TO GET THE APP\nThe committee will reconvene next week to finalize the text.",
+     "The committee will reconvene next week to finalize the text."),
+    ("Lawmakers plan to follow up on the proposal with hearings in the spring.",
+     "Lawmakers plan to follow up on the proposal with hearings in the spring."),
+    ("The measure now heads to the House for a final vote.\n© 2025 Example Media. All rights reserved.",
+     "The measure now heads to the House for a final vote."),
+    ("Governors from both parties praised the agreement on Monday.\nFollow us on Twitter for the latest updates.",
+     "Governors from both parties praised the agreement on Monday."),
+    ("Subscribe to our daily newsletter for more.\nThe vote is expected before the August recess, aides said.",
+     "The vote is expected before the August recess, aides said."),
+    ("Supporters follow Trump on Truth Social because he posts policy announcements there first, aides said.",
+     "Supporters follow Trump on Truth Social because he posts policy announcements there first, aides said."),
+    ("Copyright 2024 lawsuits have surged as AI companies train on published books without permission.",
+     "Copyright 2024 lawsuits have surged as AI companies train on published books without permission."),
+]
+
+
+def benchmark_cleaner(paragraphs: int = 2000, repeats: int = 5) -> Dict:
+    """Check CLEANER_REGRESSION_CASES and time the compiled cleaner against the old one on a long page"""
+    processor = ContentProcessor.__new__(ContentProcessor)
+    failures = [case for case, expected in CLEANER_REGRESSION_CASES if processor._deep_clean(case) != expected]
+
+    paragraph = ("Senators from both parties met on Tuesday in 2025 to debate the border funding bill, "
+                 "and aides expect a final vote before the recess according to officials familiar with it.")
+    page = '\n'.join([paragraph] * paragraphs)
+    timings = {}
+    for name, clean in (('legacy', _legacy_deep_clean), ('compiled', processor._deep_clean)):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            output = clean(page)
+        timings[name] = {'ms_per_page': round((time.perf_counter() - started) / repeats * 1000, 2),
+                         'words_kept': len(output.split())}
+
+    return {'regression_cases': len(CLEANER_REGRESSION_CASES), 'failures': failures,
+            'page_words': len(page.split()), **timings}
+
+# ============= COMMAND LINE =============
+def run_cli(argv: List[str]) -> bool:
+    """Non-UI entry points, e.g. `python app.py poll`. Returns False when no command matched."""
+    command, args = argv[0], argv[1:]
+
+    if command == 'poll':
+        poller = FeedPoller()
+        if '--once' in args:
+            print(f"{poller.poll_once()} new entries")
+        else:
+            poller.run_forever()
+        return True
+
+    if command == 'bench-score':
+        result = benchmark_scorer(int(args[0]) if args else 5000)
+        print(json.dumps(result, indent=2))
+        return True
+
+    if command == 'bench-clean':
+        result = benchmark_cleaner(int(args[0]) if args else 2000)
+        print(json.dumps(result, indent=2))
+        return True
+
+    if command == 'bench-extract':
+        # No corpus directory: benchmark the reproducible synthetic_pages() corpus
+        result = benchmark_extraction(args[0] if args else None, int(args[1]) if len(args) > 1 else 3)
+        print(json.dumps(result, indent=2))
+        return True
+
+    return False
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and run_cli(sys.argv[1:]):
+    sys.exit(0)
+
 # ============= STREAMLIT UI =============
 st.set_page_config(page_title="News Intelligence Platform", layout="wide", page_icon="📰")
 
@@ -1171,6 +3008,10 @@ if 'article_rewrites' not in st.session_state:
     st.session_state.article_rewrites = {}
 if 'use_new_prompt' not in st.session_state:
     st.session_state.use_new_prompt = False
+if 'fetch_report' not in st.session_state:
+    st.session_state.fetch_report = {}
+if 'rewrite_worker' not in st.session_state:
+    st.session_state.rewrite_worker = None
 
 st.markdown("""
 <style>
@@ -1232,11 +3073,25 @@ with tab1:
         - **Dan Rather** (Conservatives Daily): Folksy yet authoritative, investigative edge
         """)
 
+    with st.expander("Feed Source Health"):
+        health_records = FeedHealth().all()
+        if health_records:
+            health_df = pd.DataFrame(health_records)
+            for col in ['last_success', 'last_failure', 'open_until']:
+                health_df[col] = pd.to_datetime(health_df[col].where(health_df[col] > 0), unit='s')
+            health_df['latency'] = health_df['latency'].round(2)
+            st.dataframe(health_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("No feeds fetched yet")
+
     # Controls
     col1, col2, col3, col4, col5 = st.columns([1.2, 1, 1.2, 1.2, 0.8])
 
     with col1:
         num_articles = st.number_input("Number of Articles", min_value=10, max_value=50, value=40, step=5)
+        time_budget = st.number_input("Time Budget (s)", min_value=5, max_value=300,
+                                      value=ClickMovementConfig.FETCH_TIME_BUDGET, step=5,
+                                      help="Return the best articles gathered within this many seconds")
 
     with col2:
         st.write("")  # Spacer for alignment
@@ -1249,9 +3104,14 @@ with tab1:
             processor = NewsProcessor()
 
             with st.spinner(f"Fetching {num_articles} articles..."):
-                articles = processor.process_articles_global(num_articles)
+                articles = processor.process_articles_global(num_articles, time_budget=time_budget)
                 st.session_state.processed_articles = articles
                 st.session_state.article_rewrites = {}
+                st.session_state.fetch_report = processor.last_report
+                if st.session_state.rewrite_worker:
+                    st.session_state.rewrite_worker.cancel()
+                st.session_state.rewrite_worker = RewriteWorker(processor, articles, use_new_prompt)
+                st.session_state.rewrites_shown = 0
                 st.success(f"Fetched {len(articles)} articles!")
                 st.rerun()
 
@@ -1270,8 +3130,34 @@ with tab1:
             st.session_state.processed_articles = []
             st.session_state.published = set()
             st.session_state.article_rewrites = {}
+            st.session_state.fetch_report = {}
+            if st.session_state.rewrite_worker:
+                st.session_state.rewrite_worker.cancel()
+            st.session_state.rewrite_worker = None
             st.rerun()
 
+    report = st.session_state.fetch_report
+    if report.get('cut_short'):
+        st.warning(f"Time budget of {report['time_budget']}s reached after {report['elapsed']}s: "
+                   f"{', '.join(report['cut_short'])} cut short. Showing the best {report['articles']} articles found.")
+    if report.get('stages'):
+        with st.expander("Candidate Pipeline"):
+            st.dataframe(pd.DataFrame(report['stages']), use_container_width=True, hide_index=True)
+    cache_stats = get_prompt_cache_stats().snapshot()
+    if cache_stats['hits'] + cache_stats['misses'] + cache_stats['uncached']:
+        st.caption(f"Prompt cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['uncached']} uncached | {cache_stats['read_tokens']:,} of "
+                   f"{cache_stats['read_tokens'] + cache_stats['written_tokens'] + cache_stats['input_tokens']:,} "
+                   f"input tokens read from cache")
+
+    # Background rewrites finished since the last run
+    worker = st.session_state.rewrite_worker
+    if worker:
+        st.session_state.rewrites_shown = worker.progress()[0]
+        for (idx, site_key), rewrite in worker.collect().items():
+            st.session_state.article_rewrites.setdefault(idx, {}).setdefault(site_key, rewrite)
+        show_rewrite_progress()
+
     # Display articles
     if st.session_state.processed_articles:
         total = len(st.session_state.processed_articles)
@@ -1305,6 +3191,7 @@ with tab1:
                 st.write("**Select Sites to Publish:**")
 
                 selected_sites = []
+                to_rewrite = []
                 site_cols = st.columns(4)
 
                 for idx_site, (site_key, site_config) in enumerate(ClickMovementConfig.WORDPRESS_SITES.items()):
@@ -1323,39 +3210,29 @@ with tab1:
                             if idx not in st.session_state.article_rewrites:
                                 st.session_state.article_rewrites[idx] = {}
 
-                            if site_key not in st.session_state.article_rewrites[idx]:
-                                # Rewrite in this site's style
+                            if site_key in st.session_state.article_rewrites[idx]:
+                                st.caption(f"OK {site_config['writer_style']} style")
+                            elif worker and worker.pending(idx, site_key):
+                                st.caption(f"Rewriting in {site_config['writer_style']} style...")
+                            else:
+                                # Rewrite in this site's style, streamed into a full-width preview below
                                 # Use new prompt for American Conservatives if toggle is enabled
                                 use_new = st.session_state.use_new_prompt and site_key == 'american_conservatives'
                                 style_label = "New Prompt" if use_new else site_config['writer_style']
-
-                                with st.spinner(f"Rewriting in {style_label} style..."):
-                                    processor = ContentProcessor()
-                                    if use_new:
-                                        content, headlines = processor.rewrite_article_new_prompt(
-                                            article['raw_content'],
-                                            article['original_title']
-                                        )
-                                    else:
-                                        content, headlines = processor.rewrite_article(
-                                            article['raw_content'],
-                                            site_config
-                                        )
-
-                                    if content and headlines:
-                                        st.session_state.article_rewrites[idx][site_key] = {
-                                            'content': content,
-                                            'headlines': headlines,
-                                            'tags': NewsProcessor()._generate_tags(
-                                                article['original_title'],
-                                                content,
-                                                site_config
-                                            )
-                                        }
-                                        st.success(f"OK {style_label} version ready")
-                                        st.rerun()
-                            else:
-                                st.caption(f"OK {site_config['writer_style']} style")
+                                st.caption(f"Rewriting in {style_label} style...")
+                                to_rewrite.append((site_key, style_label))
+                        elif idx in st.session_state.article_rewrites and \
+                                site_key in st.session_state.article_rewrites[idx]:
+                            st.caption("Rewrite ready")
+
+                rewritten = False
+                for site_key, style_label in to_rewrite:
+                    rewrite = stream_rewrite_preview(article, site_key, style_label)
+                    if rewrite:
+                        st.session_state.article_rewrites[idx][site_key] = rewrite
+                        rewritten = True
+                if rewritten:
+                    st.rerun()
 
                 if not selected_sites and article_id not in st.session_state.published:
                     st.warning("Select at least one site to publish")
@@ -1435,8 +3312,7 @@ with tab1:
                         for img_idx, img_url in enumerate(visible_images):
                             with img_cols[img_idx]:
                                 try:
-                                    response = requests.get(img_url, timeout=5, headers={'User-Agent': 'Mozilla/5.0'})
-                                    img = Image.open(BytesIO(response.content))
+                                    img = Image.open(BytesIO(preview_image_bytes(img_url)))
                                     st.image(img, use_container_width=True)
                                     st.caption(f"Image {start_idx + img_idx + 1}")
                                 except:
@@ -1481,7 +3357,8 @@ with tab1:
                                             rewrite_data['content'],
                                             article['original_title'],
                                             site_key,
-                                            wordpress_post_id=result.get('post_id')
+                                            wordpress_post_id=result.get('post_id'),
+                                            source_content=article['raw_content']
                                         )
 
                                         # Link to newsletter
@@ -1532,7 +3409,8 @@ with tab1:
                                             rewrite_data['content'],
                                             article['original_title'],
                                             site_key,
-                                            wordpress_post_id=result.get('post_id')
+                                            wordpress_post_id=result.get('post_id'),
+                                            source_content=article['raw_content']
                                         )
 
                                         processor.db.link_article_to_newsletter(